@@ -0,0 +1,192 @@
+// assets/clientside.js
+// Clientside filtering (OPTICK_CLIENTSIDE=1, see utils/clientside.py).
+// Every function takes (zones, grades, store): it sums the selected Zone x Grade
+// slices of a pre-aggregated table and returns the KPI text, or the template
+// figure with the new arrays swapped in.
+(function () {
+    function selected(all, values) {
+        // Indices of the selected values; an empty selection means all
+        const picked = all.map((v, i) => (!values || !values.length || values.indexOf(v) >= 0) ? i : -1);
+        return picked.filter(i => i >= 0);
+    }
+
+    function sum(store, name, zones, grades) {
+        const tables = store.tables, table = tables[name];
+        const out = table.keys.map(() => 0);
+        selected(tables.zones, zones).forEach(z => selected(tables.grades, grades).forEach(g => {
+            const row = table.values[z][g];
+            for (let k = 0; k < out.length; k++) out[k] += row[k];
+        }));
+        return {keys: table.keys, values: out};
+    }
+
+    function byKey(counts) {
+        const out = {};
+        counts.keys.forEach((k, i) => { out[k] = counts.values[i]; });
+        return out;
+    }
+
+    function ranked(counts) {
+        // Like value_counts: largest first (stable), zero rows dropped
+        return counts.keys.map((k, i) => [k, counts.values[i]])
+            .filter(p => p[1] > 0)
+            .map((p, i) => [p[0], p[1], i])
+            .sort((a, b) => b[1] - a[1] || a[2] - b[2]);
+    }
+
+    function total(counts) {
+        return counts.values.reduce((a, b) => a + b, 0);
+    }
+
+    function figure(store, id) {
+        const fig = JSON.parse(JSON.stringify(store.figures[id]));
+        fig.layout.template = store.template;
+        return fig;
+    }
+
+    function monthLabel(m) {
+        return Math.floor(m / 12) + '-' + String(m % 12 + 1).padStart(2, '0');
+    }
+
+    function flows(store, zones, grades) {
+        // Hires and exits per month for the selection
+        const tables = store.tables, f = tables.flows;
+        const months = f.hires.length ? f.hires[0][0].length : 0;
+        const hires = new Array(months).fill(0), exits = new Array(months).fill(0);
+        selected(tables.zones, zones).forEach(z => selected(tables.grades, grades).forEach(g => {
+            for (let m = 0; m < months; m++) {
+                hires[m] += f.hires[z][g][m];
+                exits[m] += f.exits[z][g][m];
+            }
+        }));
+        const labels = hires.map((_, m) => monthLabel(f.start + m));
+        return {labels: labels, hires: hires, exits: exits};
+    }
+
+    function clientside(build) {
+        return function (zones, grades, store) {
+            if (!store) return window.dash_clientside.no_update;
+            return build(zones, grades, store);
+        };
+    }
+
+    window.dash_clientside = Object.assign({}, window.dash_clientside, {
+        optick: {
+            // --- Overview KPIs ---
+            kpi_headcount: clientside((zones, grades, store) => {
+                const status = byKey(sum(store, 'status', zones, grades));
+                return (status['Active'] || 0).toLocaleString('en-US');
+            }),
+            kpi_experience: clientside((zones, grades, store) => {
+                const all = total(sum(store, 'status', zones, grades));
+                const experience = sum(store, 'experience', zones, grades).values[0] || 0;
+                return (all > 0 ? (Math.round(experience / all * 10) / 10).toFixed(1) : '0') + ' Yrs';
+            }),
+            kpi_attrition: clientside((zones, grades, store) => {
+                const status = sum(store, 'status', zones, grades), all = total(status);
+                const resigned = byKey(status)['Resigned'] || 0;
+                return (all > 0 ? (Math.round(resigned / all * 1000) / 10).toFixed(1) : '0') + '%';
+            }),
+            kpi_adoption: clientside((zones, grades, store) => {
+                const software = sum(store, 'software', zones, grades), all = total(software);
+                const users = byKey(software)['Yes'] || 0;
+                return (all > 0 ? Math.round(users / all * 100).toFixed(1) : '0') + '%';
+            }),
+
+            // --- Overview charts ---
+            role_distribution: clientside((zones, grades, store) => {
+                const fig = figure(store, 'overview-role-graph'), rows = ranked(sum(store, 'role', zones, grades));
+                const trace = fig.data[0];
+                trace.y = rows.map(r => r[0]);
+                trace.x = trace.text = trace.marker.color = rows.map(r => r[1]);
+                return fig;
+            }),
+            gender_split: clientside((zones, grades, store) => {
+                const fig = figure(store, 'overview-gender-graph'), rows = ranked(sum(store, 'gender', zones, grades));
+                fig.data[0].labels = rows.map(r => r[0]);
+                fig.data[0].values = rows.map(r => r[1]);
+                if (fig.layout.annotations) fig.layout.annotations[0].text = String(byKey(sum(store, 'status', zones, grades))['Active'] || 0);
+                return fig;
+            }),
+            software_adoption: clientside((zones, grades, store) => {
+                const fig = figure(store, 'overview-adoption-graph'), counts = sum(store, 'role_software', zones, grades);
+                fig.data.forEach(trace => {
+                    const rows = counts.keys.map((k, i) => [k[0], k[1], counts.values[i]])
+                        .filter(r => r[1] === trace.name && r[2] > 0);
+                    trace.x = rows.map(r => r[0]);
+                    trace.y = rows.map(r => r[2]);
+                });
+                return fig;
+            }),
+
+            // --- Trends charts ---
+            hiring_trend: clientside((zones, grades, store) => {
+                const fig = figure(store, 'trends-hiring-graph'), f = flows(store, zones, grades);
+                const months = f.labels.map((_, m) => m).filter(m => f.hires[m] > 0 || f.exits[m] > 0);
+                fig.data.forEach(trace => {
+                    const values = trace.name === 'Joined' ? f.hires : f.exits;
+                    trace.x = months.map(m => f.labels[m]);
+                    trace.y = months.map(m => values[m]);
+                });
+                return fig;
+            }),
+            headcount_trend: clientside((zones, grades, store) => {
+                const fig = figure(store, 'trends-headcount-graph'), f = flows(store, zones, grades);
+                const net = f.hires.map((h, m) => h - f.exits[m]);
+                let running = 0;
+                const headcount = net.map(n => (running += n));
+                const bars = fig.data[0], line = fig.data[1];
+                bars.x = line.x = f.labels;
+                bars.y = net;
+                bars.marker.color = net.map(n => n >= 0 ? store.options.up_color : store.options.down_color);
+                line.y = headcount;
+                return fig;
+            }),
+            rolling_attrition: clientside((zones, grades, store) => {
+                // Same as MonthlyFlows.timeline: exits in the window over the average headcount
+                const fig = figure(store, 'trends-attrition-rate-graph'), f = flows(store, zones, grades);
+                const window_ = store.options.rolling_months;
+                const x = [], y = [];
+                let headcount = 0;
+                const headcounts = [];
+                f.hires.forEach((h, m) => {
+                    headcount += h - f.exits[m];
+                    headcounts.push(headcount);
+                    if (m < window_ - 1) return;
+                    let exits = 0, people = 0;
+                    for (let i = m - window_ + 1; i <= m; i++) { exits += f.exits[i]; people += headcounts[i]; }
+                    if (people <= 0) return;
+                    x.push(f.labels[m]);
+                    y.push(Math.round(exits / (people / window_) * 1000) / 10);
+                });
+                fig.data[0].x = x;
+                fig.data[0].y = y;
+                return fig;
+            }),
+            attrition_by_grade: clientside((zones, grades, store) => {
+                const fig = figure(store, 'trends-grade-graph'), counts = byKey(sum(store, 'exits_grade', zones, grades));
+                fig.data.forEach(trace => {
+                    const count = counts[trace.name] || 0;
+                    trace.x = count ? [trace.name] : [];
+                    trace.y = trace.text = count ? [count] : [];
+                });
+                return fig;
+            }),
+            attrition_by_dept: clientside((zones, grades, store) => {
+                const fig = figure(store, 'trends-dept-graph'), counts = sum(store, 'exits_department', zones, grades);
+                const rows = ranked(counts);
+                fig.data[0].labels = rows.map(r => r[0]);
+                fig.data[0].values = rows.map(r => r[1]);
+                if (fig.layout.annotations) fig.layout.annotations[0].text = String(total(counts));
+                return fig;
+            }),
+            top_exit_sites: clientside((zones, grades, store) => {
+                const fig = figure(store, 'trends-exit-sites-graph');
+                const rows = ranked(sum(store, 'exits_site', zones, grades)).slice(0, 5);
+                fig.data[0].y = rows.map(r => r[0]);
+                fig.data[0].x = fig.data[0].text = rows.map(r => r[1]);
+                return fig;
+            }),
+        }
+    });
+})();
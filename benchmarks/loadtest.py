@@ -0,0 +1,367 @@
+# benchmarks/loadtest.py
+"""
+Load test: simulated users against a locally started server.
+
+For each worker x thread configuration it starts `gunicorn index:server` with
+gunicorn.conf.py on a free local port, waits for /ready and runs --users
+concurrent sessions for --duration seconds. A session opens a random page
+(the page shell, then every output of the page, up to 6 requests in flight
+as a browser would) and makes a few random zone/grade selections, each
+refreshing every output of the page, with --think seconds between steps.
+The outputs are the filter-driven server callbacks of the page, read from
+/_dash-dependencies (so clientside mode is measured as served), including
+those with inputs of their own, such as the roster table's paging and the
+survival grouping, which are sent with the values the page layout starts with.
+
+Reported per configuration: throughput, per-request latency and, per page,
+the latency of a navigation and of a filter change (all outputs back), as
+p50/p95/p99. Only the standard library and a local gunicorn are used.
+
+    python -m benchmarks.loadtest                                   # 1x1, 2x1, 4x1 and 2x4 workers x threads
+    python -m benchmarks.loadtest --configs 1x4,4x1 --users 20 --rows 100000
+    python -m benchmarks.loadtest --url http://127.0.0.1:8000      # a server you started yourself
+"""
+import argparse
+import gzip
+import http.client
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+
+import numpy as np
+
+from data.schema import ZONES, GRADES
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CONFIGS = '1x1,2x1,4x1,2x4'
+CALLBACK_PATH = '/_dash-update-component'
+# Requests a browser keeps in flight to one host over HTTP/1.1
+BROWSER_CONNECTIONS = 6
+FILTER_INPUTS = ('zone-filter', 'grade-filter')
+
+
+class Client:
+    """
+    Keep-alive HTTP connections to the server, one per calling thread.
+    """
+    def __init__(self, base_url, timeout=60):
+        parts = urlsplit(base_url)
+        self.host, self.port = parts.hostname, parts.port or 80
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._local.conn = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+        return conn
+
+    def request(self, method, path, body=None):
+        """
+        (status, body); status 0 when the connection failed.
+        """
+        headers = {'Accept-Encoding': 'gzip'}
+        if body is not None:
+            body = json.dumps(body)
+            headers['Content-Type'] = 'application/json'
+        # Like a browser, retry once on a fresh connection when the server closed an idle keep-alive one
+        for attempt in range(2):
+            conn = self._connection()
+            try:
+                conn.request(method, path, body=body, headers=headers)
+                response = conn.getresponse()
+                data = response.read()
+                if response.getheader('Content-Encoding') == 'gzip':
+                    data = gzip.decompress(data)
+                return response.status, data
+            except (OSError, http.client.HTTPException):
+                conn.close()
+                self._local.conn = None
+        return 0, b''
+
+    def get_json(self, path):
+        status, body = self.request('GET', path)
+        return json.loads(body) if status == 200 else None
+
+
+def output_request(callback, zones, grades, triggered):
+    return {
+        'output': callback['output'],
+        'outputs': callback['outputs'],
+        'inputs': [{'id': 'zone-filter', 'property': 'value', 'value': zones},
+                   {'id': 'grade-filter', 'property': 'value', 'value': grades}] + callback['inputs'],
+        'changedPropIds': ['zone-filter.value'] if triggered else [],
+        'state': [],
+    }
+
+
+def page_request(path):
+    return {
+        'output': 'page-content.children',
+        'outputs': {'id': 'page-content', 'property': 'children'},
+        'inputs': [{'id': 'url', 'property': 'pathname', 'value': path}],
+        'changedPropIds': ['url.pathname'],
+        'state': [],
+    }
+
+
+def layout_values(component, values=None):
+    """
+    {(component id, property): value} for every component with an id in a layout.
+    """
+    values = {} if values is None else values
+    if isinstance(component, (list, tuple)):
+        for child in component:
+            layout_values(child, values)
+        return values
+    if not hasattr(component, 'to_plotly_json'):
+        return values
+    props = {name: getattr(component, name, None) for name in component._prop_names}
+    if props.get('id') is not None:
+        for name, value in props.items():
+            values[(props['id'], name)] = value
+    layout_values(props.get('children'), values)
+    return values
+
+
+def parse_outputs(output):
+    # 'a.figure' or, for multi-output callbacks, '..a.data...a.page_count..'
+    keys = output.strip('.').split('...') if output.startswith('..') else [output]
+    outputs = [dict(zip(('id', 'property'), key.rsplit('.', 1))) for key in keys]
+    return outputs if output.startswith('..') else outputs[0]
+
+
+def page_outputs(client):
+    """
+    path -> the filter-driven server callbacks of the page, as
+    {'output', 'outputs', 'inputs'} (inputs: the ones after the filters,
+    with the page layout's initial values).
+    """
+    from pages import overview, sites, trends, talent
+    pages = {'/': overview, '/sites': sites, '/trends': trends, '/talent': talent}
+    defaults = {path: layout_values(page.layout()) for path, page in pages.items()}
+    callbacks = {path: [] for path in pages}
+    for dependency in client.get_json('/_dash-dependencies') or []:
+        inputs = [(i['id'], i['property']) for i in dependency['inputs']]
+        if dependency.get('clientside_function') or tuple(i for i, _ in inputs[:2]) != FILTER_INPUTS:
+            continue
+        outputs = parse_outputs(dependency['output'])
+        first = (outputs[0] if isinstance(outputs, list) else outputs)['id']
+        for path, values in defaults.items():
+            if any(component_id == first for component_id, _ in values):
+                callbacks[path].append({
+                    'output': dependency['output'],
+                    'outputs': outputs,
+                    'inputs': [{'id': i, 'property': prop, 'value': values.get((i, prop))} for i, prop in inputs[2:]],
+                })
+    return callbacks
+
+
+def random_selection(rng, values):
+    # A third of the time the filter is left empty (everything selected)
+    if rng.random() < 1 / 3:
+        return None
+    return sorted(rng.sample(values, rng.randint(1, len(values))))
+
+
+class Recorder:
+    def __init__(self):
+        self.requests = []  # (page, output, seconds, ok)
+        self.steps = []     # (page, step, seconds, ok)
+        self.recording = False
+
+    def request(self, *row):
+        if self.recording:
+            self.requests.append(row)
+
+    def step(self, *row):
+        if self.recording:
+            self.steps.append(row)
+
+
+def run_session(client, outputs, recorder, rng, deadline, think, max_changes):
+    pool = ThreadPoolExecutor(BROWSER_CONNECTIONS)
+
+    def post(path, output, body):
+        start = time.perf_counter()
+        status, _ = client.request('POST', CALLBACK_PATH, body)
+        ok = status in (200, 204)
+        recorder.request(path, output, time.perf_counter() - start, ok)
+        return ok
+
+    def load_outputs(path, zones, grades, triggered):
+        futures = [pool.submit(post, path, c['output'], output_request(c, zones, grades, triggered))
+                   for c in outputs[path]]
+        return all(f.result() for f in futures)
+
+    try:
+        while time.time() < deadline:
+            path = rng.choice(sorted(outputs))
+            zones = grades = None
+            start = time.perf_counter()
+            ok = post(path, 'page-content.children', page_request(path))
+            ok = load_outputs(path, zones, grades, False) and ok
+            recorder.step(path, 'navigation', time.perf_counter() - start, ok)
+            for _ in range(rng.randint(1, max_changes)):
+                time.sleep(rng.expovariate(1 / think) if think else 0)
+                if time.time() >= deadline:
+                    break
+                zones, grades = random_selection(rng, ZONES), random_selection(rng, GRADES)
+                start = time.perf_counter()
+                ok = load_outputs(path, zones, grades, True)
+                recorder.step(path, 'filter change', time.perf_counter() - start, ok)
+    finally:
+        pool.shutdown()
+
+
+def percentiles(seconds):
+    if not seconds:
+        return {'p50': None, 'p95': None, 'p99': None}
+    p50, p95, p99 = np.percentile(np.asarray(seconds) * 1000, [50, 95, 99])
+    return {'p50': round(p50, 1), 'p95': round(p95, 1), 'p99': round(p99, 1)}
+
+
+def summarize(recorder, duration):
+    requests, steps = recorder.requests, recorder.steps
+    result = {
+        'requests': len(requests),
+        'errors': sum(not ok for *_, ok in requests),
+        'throughput': round(len(requests) / duration, 1),
+        'latency_ms': percentiles([s for _, _, s, ok in requests if ok]),
+        'pages': {},
+    }
+    for page in sorted({row[0] for row in steps}):
+        result['pages'][page] = {
+            step: {'count': len(rows), **percentiles([s for *_, s, ok in rows if ok])}
+            for step in ('navigation', 'filter change')
+            for rows in [[row for row in steps if row[0] == page and row[1] == step]]
+        }
+    return result
+
+
+def run_load(base_url, users, duration, warmup, think, max_changes, seed):
+    client = Client(base_url)
+    outputs = page_outputs(client)
+    recorder = Recorder()
+    start = time.time()
+    deadline = start + warmup + duration
+    threads = [
+        threading.Thread(target=run_session, daemon=True,
+                         args=(client, outputs, recorder, random.Random(seed + i), deadline, think, max_changes))
+        for i in range(users)
+    ]
+    for thread in threads:
+        thread.start()
+    time.sleep(warmup)
+    recorder.recording = True
+    measured_from = time.time()
+    for thread in threads:
+        thread.join()
+    result = summarize(recorder, time.time() - measured_from)
+    # Served by whichever worker takes the request
+    result['cache'] = client.get_json('/cache-stats')
+    return result
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+@contextmanager
+def local_server(workers, threads, rows=None, startup_timeout=300):
+    """
+    gunicorn index:server on a free port; yields its base URL.
+    """
+    port = free_port()
+    env = dict(os.environ)
+    if rows:
+        env['OPTICK_NUM_EMPLOYEES'] = str(rows)
+    command = [
+        sys.executable, '-m', 'gunicorn', 'index:server', '-c', 'gunicorn.conf.py',
+        '--bind', f'127.0.0.1:{port}', '--workers', str(workers), '--threads', str(threads), '--timeout', '120',
+    ]
+    log = tempfile.NamedTemporaryFile(prefix='optick-loadtest-', suffix='.log', delete=False)
+    process = subprocess.Popen(command, cwd=ROOT, env=env, stdout=log, stderr=subprocess.STDOUT)
+    base_url = f'http://127.0.0.1:{port}'
+    try:
+        client = Client(base_url, timeout=5)
+        deadline = time.time() + startup_timeout
+        while client.request('GET', '/ready')[0] != 200:
+            if process.poll() is not None or time.time() > deadline:
+                raise RuntimeError(f"Server did not become ready; see {log.name}")
+            time.sleep(0.25)
+        yield base_url
+    finally:
+        process.terminate()
+        try:
+            process.wait(15)
+        except subprocess.TimeoutExpired:
+            process.kill()
+        log.close()
+
+
+def print_result(label, result):
+    latency = result['latency_ms']
+    print(f"\n{label}")
+    print(f"  {result['requests']:,d} requests, {result['throughput']:.1f}/s, {result['errors']} errors; "
+          f"request latency p50 {latency['p50']} ms, p95 {latency['p95']} ms, p99 {latency['p99']} ms")
+    print(f"  {'page':<10}{'step':<16}{'count':>7}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for page, steps in result['pages'].items():
+        for step, row in steps.items():
+            print(f"  {page:<10}{step:<16}{row['count']:>7}{row['p50'] or '-':>10}{row['p95'] or '-':>10}{row['p99'] or '-':>10}")
+    if result.get('cache'):
+        cache = result['cache']
+        print(f"  figure cache (one worker): {cache.get('hit_rate', '-')} hit rate, {cache.get('size')}/{cache.get('maxsize')} entries")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay simulated user sessions against the Dash callback endpoint.")
+    parser.add_argument('--configs', default=CONFIGS, help="comma-separated WORKERSxTHREADS gunicorn configurations")
+    parser.add_argument('--url', help="test this running server instead of starting gunicorn")
+    parser.add_argument('--users', type=int, default=10, help="concurrent simulated users")
+    parser.add_argument('--duration', type=float, default=30, help="measured seconds per configuration")
+    parser.add_argument('--warmup', type=float, default=5, help="unmeasured seconds before measuring")
+    parser.add_argument('--think', type=float, default=0.5, help="mean pause between a user's steps (s); 0 for none")
+    parser.add_argument('--changes', type=int, default=4, help="most filter changes per page visit")
+    parser.add_argument('--rows', type=int, help="dataset size for the started servers (OPTICK_NUM_EMPLOYEES)")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', help="write the results to this JSON file")
+    args = parser.parse_args(argv)
+
+    def load(base_url):
+        return run_load(base_url, args.users, args.duration, args.warmup, args.think, args.changes, args.seed)
+
+    results = {}
+    if args.url:
+        results[args.url] = load(args.url)
+        print_result(f"{args.url}, {args.users} users", results[args.url])
+    else:
+        for config in args.configs.split(','):
+            workers, threads = (int(n) for n in config.lower().split('x'))
+            with local_server(workers, threads, args.rows) as base_url:
+                results[config] = load(base_url)
+            print_result(f"{workers} worker(s) x {threads} thread(s), {args.users} users", results[config])
+
+    if len(results) > 1:
+        print(f"\n{'config':<12}{'req/s':>8}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'errors':>8}")
+        for config, result in results.items():
+            latency = result['latency_ms']
+            print(f"{config:<12}{result['throughput']:>8.1f}{latency['p50'] or '-':>9}{latency['p95'] or '-':>9}{latency['p99'] or '-':>9}{result['errors']:>8}")
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'settings': vars(args), 'results': results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
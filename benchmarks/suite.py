@@ -0,0 +1,288 @@
+# benchmarks/suite.py
+"""
+Benchmark suite: data load, filtering and every page render across data sizes.
+
+For each size it times (median of --repeat runs) and measures the peak
+Python/numpy allocation (tracemalloc, one separate run) of:
+
+    generate            data.engine.generate_workforce
+    load_data           data.engine.load_data from the snapshot (written on first use,
+                        in a temporary directory)
+    store               WorkforceStore indexes (filter bitmaps, cube, monthly flows, quantiles)
+    filter/<step>       the filter step behind every callback: the view's rows,
+                        cube slice, monthly flows and timeline, per filter set
+    render/<page>       pages.<page>.render_<page> on a fresh view (filtering included)
+    output/<id>         each page output on a view whose inputs are already built,
+                        with the time spent in its plot_* function alongside
+    survival/<group>    the retention curves offered on the Trends page
+
+Results are compared with a JSON baseline; a case slower (or hungrier) than
+the baseline by more than --threshold is reported and the exit code is 1.
+
+    python -m benchmarks.suite                           # 5k, 100k and 1M rows vs benchmarks/baseline.json
+    python -m benchmarks.suite --sizes 5000 --repeat 3   # quick run
+    python -m benchmarks.suite --save                    # record the results as the baseline
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from config import DATA_SEED
+
+SIZES = [5_000, 100_000, 1_000_000]
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+THRESHOLD = 0.25
+# Differences below these are noise, whatever the ratio
+MIN_MS = 2.0
+MIN_KB = 512
+
+FILTER_SETS = {
+    'all': {'Zone': None, 'Grade': None},
+    'north-l1-l2': {'Zone': ['North'], 'Grade': ['L1 (Associate)', 'L2 (Skilled)']},
+}
+VIEW_STEPS = ['rows', 'cells', 'flows', 'timeline']
+
+
+def quiet(fn, *args, **kwargs):
+    # The engine reports progress on stdout
+    with contextlib.redirect_stdout(io.StringIO()):
+        return fn(*args, **kwargs)
+
+
+class PlotTimer:
+    """
+    Swaps the plot_* functions a page module imported for timed wrappers,
+    so an output's time can be split into input preparation and plotting.
+    """
+    def __init__(self, modules):
+        self.modules = modules
+        self.calls = []
+
+    def __enter__(self):
+        self.originals = []
+        for module in self.modules:
+            for name, fn in list(vars(module).items()):
+                if name.startswith('plot_') and callable(fn):
+                    self.originals.append((module, name, fn))
+                    setattr(module, name, self._timed(name, fn))
+        return self
+
+    def __exit__(self, *exc):
+        for module, name, fn in self.originals:
+            setattr(module, name, fn)
+
+    def _timed(self, name, fn):
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                self.calls.append((name, (time.perf_counter() - start) * 1000))
+        return timed
+
+
+class Suite:
+    def __init__(self, repeat=5, memory=True, only=None):
+        self.repeat = repeat
+        self.memory = memory
+        self.only = only
+        self.results = {}
+
+    def run(self, name, fn, setup=None, repeat=None, plot_timer=None):
+        """
+        Times fn(setup()) — setup is not timed — and records the result under `name`.
+        """
+        if self.only and self.only not in name:
+            return
+        setup = setup or (lambda: None)
+        times, plots = [], []
+        for _ in range(repeat or self.repeat):
+            arg = setup()
+            if plot_timer is not None:
+                plot_timer.calls.clear()
+            start = time.perf_counter()
+            quiet(fn, arg)
+            times.append((time.perf_counter() - start) * 1000)
+            if plot_timer is not None:
+                plots.append(plot_timer.calls[:])
+        result = {'ms': round(statistics.median(times), 3), 'min_ms': round(min(times), 3)}
+        if plots and plots[0]:
+            result['plot'] = ', '.join(sorted({call for call, _ in plots[0]}))
+            result['plot_ms'] = round(statistics.median(sum(ms for _, ms in run) for run in plots), 3)
+        if self.memory:
+            arg = setup()
+            tracemalloc.start()
+            try:
+                quiet(fn, arg)
+                result['peak_kb'] = round(tracemalloc.get_traced_memory()[1] / 1024)
+            finally:
+                tracemalloc.stop()
+        self.results[name] = result
+        line = f"  {name:<48}{result['ms']:>10.1f} ms"
+        if 'peak_kb' in result:
+            line += f"{result['peak_kb']:>12,d} KB"
+        if 'plot_ms' in result:
+            line += f"   {result['plot']} {result['plot_ms']:.1f} ms"
+        print(line)
+        sys.stdout.flush()
+
+
+@contextlib.contextmanager
+def scratch_snapshots():
+    # load_data writes snapshots: keep them out of the app's snapshot directory
+    from data import snapshot
+    saved = snapshot.SNAPSHOT_DIR
+    with tempfile.TemporaryDirectory(prefix="optick-bench-") as folder:
+        snapshot.SNAPSHOT_DIR = folder
+        try:
+            yield folder
+        finally:
+            snapshot.SNAPSHOT_DIR = saved
+
+
+def geometry():
+    # Map outputs need the served geometry levels; a throwaway app stands in for the real one
+    import dash
+    from data.engine import load_geojson
+    from data.geo import register_geo_routes
+    return quiet(register_geo_routes, dash.Dash(__name__), load_geojson)
+
+
+def run_size(suite, size, geo):
+    from data.engine import generate_workforce, load_data
+    from data.store import WorkforceStore
+    from data.view import WorkforceView
+    from pages import overview, sites, trends, talent
+
+    suite.run('generate', lambda _: generate_workforce(size, DATA_SEED), repeat=1)
+    # The lru_cache would turn every repeat into a dict lookup; the first call writes the snapshot
+    load = load_data.__wrapped__
+    df, _ = quiet(load, size, DATA_SEED, None)
+    suite.run('load_data', lambda _: load(size, DATA_SEED, None), repeat=min(suite.repeat, 3))
+    suite.run('store', lambda _: WorkforceStore(df), repeat=min(suite.repeat, 3))
+    store = WorkforceStore(df)
+
+    def view(filters):
+        return WorkforceView(store, filters, geo)
+
+    def warm_view(filters):
+        fresh = view(filters)
+        for step in VIEW_STEPS:
+            getattr(fresh, step)
+        return fresh
+
+    for label, filters in FILTER_SETS.items():
+        for step in VIEW_STEPS:
+            suite.run(f'filter/{step}[{label}]', lambda v, step=step: getattr(v, step), setup=lambda f=filters: view(f))
+
+    pages = {'overview': overview, 'sites': sites, 'trends': trends, 'talent': talent}
+    for label, filters in FILTER_SETS.items():
+        for name, page in pages.items():
+            render = getattr(page, f'render_{name}')
+            suite.run(f'render/{name}[{label}]', render, setup=lambda f=filters: view(f))
+
+    filters = FILTER_SETS['north-l1-l2']
+    with PlotTimer(pages.values()) as plot_timer:
+        for page in pages.values():
+            for (component_id, prop), build in page.OUTPUTS.items():
+                suite.run(f'output/{component_id}', build, setup=lambda: warm_view(filters), plot_timer=plot_timer)
+        for group, (column, top) in trends.SURVIVAL_OPTIONS.items():
+            suite.run(f'survival/{group}', lambda v, c=column, t=top: trends.plot_survival(v.survival(c, t)),
+                      setup=lambda: warm_view(filters), plot_timer=plot_timer)
+        suite.run('output/talent-roster-table', lambda v: talent.roster_page(v.rows, 0, 10, [], ''),
+                  setup=lambda: warm_view(filters))
+
+
+def environment():
+    return {
+        'recorded': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'numpy': np.__version__,
+        'machine': f"{platform.system()} {platform.machine()} ({os.cpu_count()} CPUs)",
+    }
+
+
+def compare(results, baseline, threshold):
+    """
+    (size, case, metric, baseline value, new value) for every regression.
+    """
+    regressions = []
+    for size, cases in results.items():
+        for name, new in cases.items():
+            old = baseline.get(size, {}).get(name)
+            if old is None:
+                continue
+            for metric, floor in (('ms', MIN_MS), ('peak_kb', MIN_KB)):
+                if metric in old and metric in new and new[metric] > old[metric] * (1 + threshold) and new[metric] - old[metric] > floor:
+                    regressions.append((size, name, metric, old[metric], new[metric]))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time data load, filtering and page renders across data sizes.")
+    parser.add_argument('--sizes', default=','.join(str(s) for s in SIZES), help="comma-separated row counts")
+    parser.add_argument('--repeat', type=int, default=5, help="runs per case (the median is kept)")
+    parser.add_argument('--only', help="only run cases whose name contains this")
+    parser.add_argument('--no-memory', action='store_true', help="skip the tracemalloc peak-memory runs")
+    parser.add_argument('--baseline', default=BASELINE_PATH, help="baseline JSON to compare with / save to")
+    parser.add_argument('--threshold', type=float, default=THRESHOLD, help="allowed slowdown ratio before flagging (0.25 = 25%%)")
+    parser.add_argument('--save', action='store_true', help="write the results into the baseline")
+    parser.add_argument('--output', help="also write this run's results to a JSON file")
+    args = parser.parse_args(argv)
+
+    suite = Suite(args.repeat, memory=not args.no_memory, only=args.only)
+    geo = geometry()
+    results = {}
+    with scratch_snapshots():
+        for size in (int(s) for s in args.sizes.split(',')):
+            print(f"\n{size:,d} rows")
+            suite.results = {}
+            run_size(suite, size, geo)
+            results[str(size)] = suite.results
+
+    run = {'environment': environment(), 'results': results}
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(run, f, indent=2)
+
+    baseline = None
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    regressions = compare(results, baseline['results'], args.threshold) if baseline else []
+    if baseline:
+        print(f"\nCompared with the baseline recorded {baseline['environment']['recorded']} on {baseline['environment']['machine']}")
+        for size, name, metric, old, new in regressions:
+            print(f"  REGRESSION {int(size):,d} rows {name} {metric}: {old:,} -> {new:,} ({new / old - 1:+.0%})")
+        if not regressions:
+            print(f"  No case regressed by more than {args.threshold:.0%}")
+    elif not args.save:
+        print(f"\nNo baseline at {args.baseline}; record one with --save")
+
+    if args.save:
+        # Sizes and cases not run this time keep their previous baseline
+        saved = baseline['results'] if baseline else {}
+        for size, cases in results.items():
+            saved.setdefault(size, {}).update(cases)
+        with open(args.baseline, 'w') as f:
+            json.dump({'environment': run['environment'], 'results': saved}, f, indent=2)
+        print(f"Baseline written to {args.baseline}")
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,13 @@
 import dash_bootstrap_components as dbc
 from dash import html
 
-def kpi_widget(title, val, icon, color):
+def kpi_widget(title, val, icon, color, value_id=None):
+    # value_id lets a callback fill in / update the value after the card is rendered
+    value = html.Div(val, className="kpi-value") if value_id is None else html.Div(val, id=value_id, className="kpi-value")
     return dbc.Col(html.Div([
         html.Div([
             html.Div(title, className="kpi-title"),
-            html.Div(val, className="kpi-value")
+            value
         ]),
         html.Div(icon, style={
             'fontSize': '1.8rem', 'color': color, 
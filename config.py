@@ -16,4 +16,39 @@ DANGER = "#EF4444"         # Red
 FONT_FAMILY = "Inter"
 
 # Map Data URL
-GEOJSON_URL = "https://raw.githubusercontent.com/Subhash9325/GeoJson-Data-of-Indian-States/master/Indian_States"
\ No newline at end of file
+GEOJSON_URL = "https://raw.githubusercontent.com/Subhash9325/GeoJson-Data-of-Indian-States/master/Indian_States"
+
+# Data Engine
+# Override with OPTICK_NUM_EMPLOYEES=1000000 to load-test at realistic sizes.
+import os
+NUM_EMPLOYEES = int(os.environ.get("OPTICK_NUM_EMPLOYEES", 5000))
+DATA_SEED = int(os.environ.get("OPTICK_DATA_SEED", 42))
+
+# Real HRMS extract (CSV or Parquet, see data/loaders.py). Unset: generate synthetic data.
+DATA_SOURCE = os.environ.get("OPTICK_DATA_SOURCE") or None
+
+# Snapshot cache (see data/snapshot.py). Set OPTICK_SNAPSHOT=0 to always regenerate.
+SNAPSHOT_ENABLED = os.environ.get("OPTICK_SNAPSHOT", "1") != "0"
+SNAPSHOT_DIR = os.environ.get("OPTICK_SNAPSHOT_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", ".snapshots"))
+
+# Rendered figure/layout cache (see utils/cache.py)
+FIGURE_CACHE_SIZE = int(os.environ.get("OPTICK_FIGURE_CACHE_SIZE", 256))
+
+# Event ingestion (see data/store.py). POST /events is only mounted with OPTICK_INGEST=1.
+INGEST_ENABLED = os.environ.get("OPTICK_INGEST", "0") == "1"
+
+# Client-side filtering (see utils/clientside.py). OPTICK_CLIENTSIDE=1 redraws the count charts in the browser.
+CLIENTSIDE_FILTERING = os.environ.get("OPTICK_CLIENTSIDE", "0") == "1"
+
+# Response compression (see utils/compression.py). OPTICK_COMPRESS=0 sends callback and asset responses uncompressed.
+COMPRESS_RESPONSES = os.environ.get("OPTICK_COMPRESS", "1") != "0"
+
+# Callback timing (see utils/metrics.py). OPTICK_METRICS=0 drops /metrics and the per-callback log lines.
+METRICS_ENABLED = os.environ.get("OPTICK_METRICS", "1") != "0"
+LOG_LEVEL = os.environ.get("OPTICK_LOG_LEVEL", "INFO").upper()
+
+# Page renders (see utils/render.py): threads building a page's outputs concurrently. OPTICK_RENDER_WORKERS=1 builds them serially.
+RENDER_WORKERS = int(os.environ.get("OPTICK_RENDER_WORKERS", min(4, os.cpu_count() or 1)))
+
+# Plot input guard (see utils/guards.py). OPTICK_GUARD_INPUTS=1 fails any plot that modifies its inputs.
+GUARD_INPUTS = os.environ.get("OPTICK_GUARD_INPUTS", "0") == "1"
@@ -0,0 +1,8 @@
+# data/__init__.py
+import pandas as pd
+
+# Copy-on-write: filtered frames, column projections and shallow copies share
+# memory with the frame they came from until one of them is written to, so the
+# render pipeline passes views around instead of copies and can't modify the
+# workforce frame behind the store's back
+pd.set_option("mode.copy_on_write", True)
@@ -0,0 +1,92 @@
+# data/cube.py
+"""
+Pre-aggregated workforce cube.
+
+Headcount (and summed experience) per observed combination of the dimensions
+below, built once at load time. The count charts and KPI cards slice the cube
+by the sidebar filters and sum it, so their per-request cost depends on the
+number of cells (bounded by the dimension cardinalities), not on headcount.
+City, State and Is_High_Profile are attributes of the site, so they don't add
+cells. Events add or remove single contributions (see data/store.py); cells
+that drop to zero stay in place.
+"""
+import numpy as np
+import pandas as pd
+from data.filters import FilterIndex
+
+CUBE_DIMENSIONS = [
+    'Zone', 'Grade', 'Role', 'Department', 'Site_Name', 'City', 'State', 'Is_High_Profile',
+    'Status', 'Gender', 'Software_User', 'Primary_Skill'
+]
+
+
+class WorkforceCube:
+    def __init__(self, df, dimensions=CUBE_DIMENSIONS):
+        self.dimensions = list(dimensions)
+        self.cells = (
+            df.groupby(self.dimensions, observed=True)
+            .agg(Count=('Emp_ID', 'size'), Experience_Sum=('Total_Experience', 'sum'))
+            .reset_index()
+        )
+        self.index = FilterIndex(self.cells)
+        self._positions = None
+
+    def _cell_positions(self, rows):
+        """
+        Cell position of each row, adding empty cells for unseen combinations.
+        """
+        if self._positions is None:
+            self._positions = {key: i for i, key in enumerate(zip(*(self.cells[d].tolist() for d in self.dimensions)))}
+        keys = list(zip(*(rows[d].tolist() for d in self.dimensions)))
+        new_keys = [key for key in dict.fromkeys(keys) if key not in self._positions]
+        if new_keys:
+            new_cells = pd.DataFrame(new_keys, columns=self.dimensions)
+            for d in self.dimensions:
+                if isinstance(rows[d].dtype, pd.CategoricalDtype):
+                    dtype = rows[d].dtype
+                    if not dtype.categories.equals(self.cells[d].cat.categories):
+                        self.cells[d] = self.cells[d].cat.set_categories(dtype.categories)
+                    new_cells[d] = pd.Categorical(new_cells[d], dtype=dtype)
+            new_cells['Count'] = 0
+            new_cells['Experience_Sum'] = 0.0
+            for key in new_keys:
+                self._positions[key] = len(self._positions)
+            self.cells = pd.concat([self.cells, new_cells], ignore_index=True)
+            self.index.append(new_cells)
+        return np.array([self._positions[key] for key in keys], dtype=np.int64)
+
+    def add(self, rows, sign=1):
+        """
+        Adds (sign=1) or removes (sign=-1) the contributions of `rows`. Builds
+        new Count / Experience_Sum columns, so slices handed out earlier are
+        left as they were.
+        """
+        positions = self._cell_positions(rows)
+        counts = self.cells['Count'].to_numpy().copy()
+        experience = self.cells['Experience_Sum'].to_numpy().copy()
+        np.add.at(counts, positions, sign)
+        np.add.at(experience, positions, sign * rows['Total_Experience'].to_numpy())
+        self.cells = self.cells.assign(Count=counts, Experience_Sum=experience)
+
+    def slice(self, filters):
+        """
+        Cells matching the sidebar filters ({column: [values]}).
+        """
+        return self.index.select(self.cells, filters)
+
+
+def total(cells, **where):
+    """
+    Headcount in a cube slice, optionally restricted to column == value.
+    """
+    for col, value in where.items():
+        cells = cells[cells[col] == value]
+    return int(cells['Count'].sum())
+
+
+def value_counts(cells, column):
+    """
+    Cube equivalent of df[column].value_counts(): largest first, no zero rows.
+    """
+    counts = cells.groupby(column, observed=True)['Count'].sum()
+    return counts[counts > 0].sort_values(ascending=False, kind='stable')
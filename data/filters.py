@@ -0,0 +1,103 @@
+# data/filters.py
+"""
+Bitmap index for the sidebar filters.
+
+One packed bitmask (1 bit per employee) is built per Zone and per Grade value
+at load time. A selection ORs the bitmasks of the chosen values within a
+column and ANDs across columns, then turns the result into row positions, so
+a request never scans or copies the string columns of the base frame.
+Appended rows and changed values update the bits in place.
+"""
+import numpy as np
+
+FILTER_COLUMNS = ('Zone', 'Grade')
+
+
+def _append_bits(packed, num_bits, bits):
+    """
+    Packed bitmask of `num_bits` bits with `bits` appended. Only the trailing
+    partial byte is repacked.
+    """
+    tail = num_bits % 8
+    if tail:
+        bits = np.concatenate([np.unpackbits(packed[-1:], count=tail), bits])
+        packed = packed[:-1]
+    return np.concatenate([packed, np.packbits(bits)])
+
+
+class FilterIndex:
+    def __init__(self, df, columns=FILTER_COLUMNS):
+        self.columns = list(columns)
+        self.num_rows = len(df)
+        self.bitmaps = {}
+        for col in columns:
+            codes = df[col].cat.codes.to_numpy()
+            self.bitmaps[col] = {
+                value: np.packbits(codes == i) for i, value in enumerate(df[col].cat.categories)
+            }
+
+    def mask(self, filters):
+        """
+        Packed bitmask for {column: [values]}; None when nothing is filtered.
+        Unknown values match no rows.
+        """
+        result = None
+        for col, values in filters.items():
+            if not values:
+                continue
+            col_mask = np.zeros((self.num_rows + 7) // 8, dtype=np.uint8)
+            for value in values:
+                bitmap = self.bitmaps[col].get(value)
+                if bitmap is not None:
+                    np.bitwise_or(col_mask, bitmap, out=col_mask)
+            result = col_mask if result is None else np.bitwise_and(result, col_mask, out=result)
+        return result
+
+    def append(self, rows):
+        """
+        Extends every bitmask with the rows appended to the base frame.
+        """
+        for col in self.columns:
+            values = rows[col].to_numpy()
+            bitmaps = self.bitmaps[col]
+            for value in set(bitmaps) | set(values):
+                bitmap = bitmaps.get(value, np.zeros((self.num_rows + 7) // 8, dtype=np.uint8))
+                bitmaps[value] = _append_bits(bitmap, self.num_rows, values == value)
+        self.num_rows += len(rows)
+
+    def update(self, positions, before, after):
+        """
+        Moves the bits of rows whose indexed values changed (before/after are
+        the old and new values of the rows at `positions`).
+        """
+        positions = np.asarray(positions)
+        byte, bit = positions >> 3, (0x80 >> (positions & 7)).astype(np.uint8)
+        for col in self.columns:
+            old, new = before[col].to_numpy(), after[col].to_numpy()
+            changed = old != new
+            for value in set(old[changed]):
+                hit = changed & (old == value)
+                np.bitwise_and.at(self.bitmaps[col][value], byte[hit], ~bit[hit])
+            for value in set(new[changed]):
+                hit = changed & (new == value)
+                if value not in self.bitmaps[col]:
+                    self.bitmaps[col][value] = np.zeros((self.num_rows + 7) // 8, dtype=np.uint8)
+                np.bitwise_or.at(self.bitmaps[col][value], byte[hit], bit[hit])
+
+    def rows(self, filters):
+        """
+        Sorted row positions matching the filters, or None for "all rows".
+        """
+        mask = self.mask(filters)
+        if mask is None:
+            return None
+        return np.flatnonzero(np.unpackbits(mask, count=self.num_rows))
+
+    def select(self, df, filters):
+        """
+        The filtered frame. Without filters this is a shallow copy of the base
+        frame: no data is copied, and with copy-on-write (see data/__init__.py)
+        writing to it can't change the base frame.
+        """
+        rows = self.rows(filters)
+        return df.copy(deep=False) if rows is None else df.take(rows)
@@ -0,0 +1,136 @@
+# data/geo.py
+"""
+Map geometry served as static assets.
+
+Each level of detail built by data/simplify_map.py is served from a
+content-hashed URL with a long-lived cache header. Figures reference a URL
+instead of embedding the geometry, so the browser downloads each level at
+most once and map renders/updates only carry per-state values. MapGeometry
+picks the lightest level that fits the current view.
+"""
+import hashlib
+import json
+import math
+import os
+from flask import Response, redirect, request
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+LEVELS_DIR = os.path.join(BASE_DIR, "geo_levels")
+MANIFEST_FILE = "levels.json"
+GEOJSON_ROUTE = "/geo/india_states.<level>.<digest>.geojson"
+
+# Source names that differ from the State values used by the engine
+STATE_NAME_FIXES = {'NCT of Delhi': 'Delhi'}
+
+# Country-wide view of the Site Intel map
+DEFAULT_CENTER = {"lat": 22, "lon": 82}
+DEFAULT_ZOOM = 3.2
+MAX_FIT_ZOOM = 7
+
+
+def encode_geojson(geojson):
+    """
+    Compact JSON bytes for the geometry and a short content hash for its URL.
+    """
+    body = json.dumps(geojson, separators=(',', ':')).encode()
+    return body, hashlib.sha256(body).hexdigest()[:16]
+
+
+def load_levels(levels_dir=LEVELS_DIR):
+    """
+    The level manifest and the raw GeoJSON bytes per level, or None if the
+    build step hasn't been run.
+    """
+    manifest_path = os.path.join(levels_dir, MANIFEST_FILE)
+    if not os.path.exists(manifest_path):
+        return None
+    with open(manifest_path, 'r') as f:
+        manifest = json.load(f)
+    bodies = {}
+    for level in manifest['levels']:
+        with open(os.path.join(levels_dir, level['file']), 'rb') as f:
+            bodies[level['name']] = f.read()
+    return manifest, bodies
+
+
+class MapGeometry:
+    """
+    The URLs of the served levels (lightest first) and the state bounding boxes.
+    """
+    def __init__(self, levels, bounds=None):
+        self.levels = levels
+        self.bounds = bounds or {}
+
+    def url_for_zoom(self, zoom):
+        for level in self.levels:
+            if zoom <= level['max_zoom']:
+                return level['url']
+        return self.levels[-1]['url']
+
+    def viewport(self, states=None):
+        """
+        Center and zoom that fit the given states; the country view when
+        there is nothing to fit.
+        """
+        boxes = [self.bounds[s] for s in (states or []) if s in self.bounds]
+        if not boxes:
+            return DEFAULT_CENTER, DEFAULT_ZOOM
+        min_lon, min_lat = min(b[0] for b in boxes), min(b[1] for b in boxes)
+        max_lon, max_lat = max(b[2] for b in boxes), max(b[3] for b in boxes)
+        # Web-mercator zoom where the span fills the (wider than tall) map panel
+        span = max(max_lon - min_lon, (max_lat - min_lat) * 1.5, 0.5)
+        zoom = min(max(math.log2(360 / span) - 0.2, DEFAULT_ZOOM), MAX_FIT_ZOOM)
+        return {"lat": (min_lat + max_lat) / 2, "lon": (min_lon + max_lon) / 2}, round(zoom, 2)
+
+
+def _serve(body, digest):
+    if request.headers.get('If-None-Match') == f'"{digest}"':
+        return Response(status=304)
+    return Response(body, mimetype='application/geo+json', headers={
+        # The URL changes whenever the content does
+        'Cache-Control': 'public, max-age=31536000, immutable',
+        'ETag': f'"{digest}"',
+    })
+
+
+def register_geo_routes(app, geojson=None, levels_dir=LEVELS_DIR):
+    """
+    Serves the map geometry on the Flask server behind a Dash app and returns
+    a MapGeometry for the figures (None when there is no geometry). Uses the
+    built levels when present, else `geojson` as a single level. `geojson` may
+    be a function returning it, so it is only loaded when the levels are missing.
+    """
+    built = load_levels(levels_dir)
+    if built is None and callable(geojson):
+        geojson = geojson()
+    if built is not None:
+        manifest, bodies = built
+        levels = [dict(level) for level in manifest['levels']]
+        bounds = manifest.get('bounds')
+    elif geojson is not None:
+        body, _ = encode_geojson(geojson)
+        levels, bodies, bounds = [{'name': 'full', 'max_zoom': float('inf')}], {'full': body}, None
+    else:
+        return None
+
+    served = {}
+    for level in levels:
+        body = bodies[level['name']]
+        digest = hashlib.sha256(body).hexdigest()[:16]
+        served[level['name']] = (body, digest)
+        level['url'] = app.get_relative_path(
+            GEOJSON_ROUTE.replace('<level>', level['name']).replace('<digest>', digest)
+        )
+
+    urls = {level['name']: level['url'] for level in levels}
+
+    def india_geojson(level, digest):
+        if level not in served:
+            return Response(status=404)
+        if digest != served[level][1]:
+            # A stale (or made-up) URL must not get the current body cached as immutable under it
+            return redirect(urls[level], code=302)
+        return _serve(*served[level])
+
+    app.server.add_url_rule(GEOJSON_ROUTE, 'india_geojson', india_geojson)
+    return MapGeometry(levels, bounds)
@@ -0,0 +1,266 @@
+# data/loaders.py
+"""
+Loaders for real HRMS extracts (CSV or Parquet).
+
+The file is streamed in chunks. Each chunk is validated against the columns
+the pages expect, converted straight to the compact schema (integer IDs,
+category codes, int8 scores) and the derived columns are computed on it, so
+only compact arrays are kept between chunks and peak memory is roughly the
+size of the final frame plus one raw chunk. Rows that fail validation are
+counted per reason and can be written out for the HR team.
+
+    python -m data.loaders extract.csv [--rejects rejects.csv] [--chunk-rows N]
+"""
+import argparse
+import os
+from collections import Counter
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from data.schema import CATEGORICAL_COLUMNS, NUMERIC_COLUMNS, MAX_YEARS, parse_emp_id, month_ordinal, month_label, exit_month, memory_report
+
+try:
+    import pyarrow.parquet as pq
+except ImportError:  # Only needed for Parquet extracts
+    pq = None
+
+CHUNK_ROWS = 100_000
+
+# Columns every extract must carry
+REQUIRED_COLUMNS = [
+    'Emp_ID', 'Name', 'Role', 'Department', 'Grade', 'Gender', 'Site_Name', 'City', 'State', 'Zone',
+    'Join_Date', 'Compliance_Score', 'Education', 'Primary_Skill',
+]
+# Columns that may be missing from an extract, with the value used when they are
+OPTIONAL_COLUMNS = {
+    'Category': 'Standard (Day)', 'Is_High_Profile': False, 'Status': None, 'Resignation_Date': None,
+    'Shift': 'General', 'Software_User': 'No', 'Total_Experience': None,
+}
+DATE_COLUMNS = ['Join_Date', 'Resignation_Date']
+TRUE_VALUES = {'true', 'yes', 'y', '1'}
+
+# Output column order (matches generate_workforce)
+COLUMN_ORDER = [
+    'Emp_ID', 'Name', 'Role', 'Department', 'Grade', 'Gender', 'Site_Name', 'City', 'State', 'Zone',
+    'Category', 'Is_High_Profile', 'Join_Date', 'Status', 'Resignation_Date', 'Compliance_Score', 'Shift',
+    'Software_User', 'Education', 'Primary_Skill', 'Tenure_Years', 'Total_Experience', 'Join_Month',
+    'Join_Month_Year', 'Exit_Month', 'Rating',
+]
+
+
+class _CodeBook:
+    """
+    Category codes for one text column, grown as new values appear in later chunks.
+    """
+    MISSING, UNKNOWN = -1, -2
+
+    def __init__(self, categories=None):
+        self.fixed = categories is not None
+        self.values = list(categories or [])
+        self.lookup = {v: i for i, v in enumerate(self.values)}
+
+    def encode(self, values):
+        """
+        int32 codes for a chunk; MISSING for empty values and UNKNOWN for values
+        outside a fixed vocabulary. Values are trimmed once per distinct value.
+        """
+        codes, uniques = pd.factorize(values, use_na_sentinel=True)
+        remap = np.empty(len(uniques) + 1, dtype=np.int32)
+        remap[-1] = self.MISSING
+        for i, value in enumerate(uniques):
+            value = str(value).strip()
+            if not value:
+                remap[i] = self.MISSING
+                continue
+            if value not in self.lookup and not self.fixed:
+                self.lookup[value] = len(self.values)
+                self.values.append(value)
+            remap[i] = self.lookup.get(value, self.UNKNOWN)
+        return remap[codes]
+
+    def categorical(self, codes, column):
+        categories, ordered = CATEGORICAL_COLUMNS[column]
+        cat = pd.Categorical.from_codes(codes, categories=self.values, ordered=ordered)
+        # Inferred vocabularies are sorted, like schema.categorical
+        return cat if self.fixed else cat.reorder_categories(sorted(self.values))
+
+
+def _parse_distinct(values, parse, missing):
+    """
+    Parses each distinct raw value once (dates and scores repeat a lot). Returns
+    the parsed array (`missing` where empty or unparseable) and a mask of the
+    rows that had a value.
+    """
+    codes, uniques = pd.factorize(values, use_na_sentinel=True)
+    parsed = np.append(np.asarray(parse(pd.Series(uniques, dtype=object))), missing)
+    return parsed[codes], codes >= 0
+
+
+def _iter_chunks(path, chunk_rows):
+    wanted = REQUIRED_COLUMNS + list(OPTIONAL_COLUMNS)
+    ext = os.path.splitext(path)[1].lower()
+    if ext in ('.parquet', '.pq'):
+        if pq is None:
+            raise ImportError("Reading Parquet extracts needs pyarrow (pip install pyarrow)")
+        parquet = pq.ParquetFile(path)
+        columns = [c for c in wanted if c in parquet.schema_arrow.names]
+        for batch in parquet.iter_batches(batch_size=chunk_rows, columns=columns):
+            yield batch.to_pandas()
+    else:
+        # Raw strings: types are parsed (and failures reported) by _convert_chunk
+        yield from pd.read_csv(path, chunksize=chunk_rows, dtype=str, usecols=lambda c: c in wanted)
+
+
+def _convert_chunk(chunk, codebooks, as_of, seen_ids=None):
+    """
+    Validates one raw chunk and converts it to compact arrays. Returns
+    ({column: array} for the accepted rows, rejection reason per row or None).
+    `seen_ids` (sorted) are the Emp_IDs accepted from earlier chunks: a row
+    repeating one, or an earlier valid row of the chunk, is a duplicate.
+    """
+    n = len(chunk)
+    for col, default in OPTIONAL_COLUMNS.items():
+        if col not in chunk:
+            chunk[col] = default
+    # First failing check per row: index into `messages`, 0 = accepted
+    failed = np.zeros(n, dtype=np.int16)
+    messages = [None]
+
+    def reject(mask, reason):
+        mask = np.asarray(mask) & (failed == 0)
+        if mask.any():
+            failed[mask] = len(messages)
+            messages.append(reason)
+
+    out = {}
+    emp_id = parse_emp_id(chunk['Emp_ID'].to_numpy()).to_numpy(dtype=float)
+    reject(np.isnan(emp_id) | (emp_id < 0) | (emp_id > np.iinfo(np.int32).max), 'invalid Emp_ID')
+    out['Emp_ID'] = np.where(failed == 0, emp_id, 0).astype(np.int32)
+
+    for col in DATE_COLUMNS:
+        out[col], given = _parse_distinct(chunk[col].to_numpy(), lambda u: pd.to_datetime(u, errors='coerce'), np.datetime64('NaT'))
+        reject(given & pd.isna(out[col]), f'invalid {col}')
+    reject(pd.isna(out['Join_Date']), 'missing Join_Date')
+    reject(out['Join_Date'] > as_of, 'Join_Date in the future')
+    reject(out['Resignation_Date'] < out['Join_Date'], 'Resignation_Date before Join_Date')
+
+    score, _ = _parse_distinct(chunk['Compliance_Score'].to_numpy(), lambda u: pd.to_numeric(u, errors='coerce'), np.nan)
+    score = score.astype(float)
+    reject(~((score >= 0) & (score <= 100)), 'Compliance_Score outside 0-100')
+    reject(score != np.round(score), 'Compliance_Score not a whole number')
+    out['Compliance_Score'] = np.nan_to_num(score).astype(np.int8)
+
+    # Status follows the exit date when the extract doesn't carry it
+    if chunk['Status'].isna().all():
+        chunk['Status'] = np.where(pd.isna(out['Resignation_Date']), 'Active', 'Resigned')
+
+    for col, book in codebooks.items():
+        codes = book.encode(chunk[col].to_numpy())
+        reject(codes == book.MISSING, f'missing {col}')
+        reject(codes == book.UNKNOWN, f'unknown {col}')
+        out[col] = codes
+
+    high = chunk['Is_High_Profile']
+    if high.dtype == object:
+        flags, _ = _parse_distinct(high.to_numpy(), lambda u: u.astype(str).str.strip().str.lower().isin(TRUE_VALUES), False)
+        out['Is_High_Profile'] = flags.astype(bool)
+    else:
+        out['Is_High_Profile'] = high.fillna(False).astype(bool).to_numpy()
+
+    # Derived columns
+    join = pd.Series(out['Join_Date'])
+    tenure = np.round((as_of - join).dt.days.to_numpy() / 365, 1)
+    experience, _ = _parse_distinct(chunk['Total_Experience'].to_numpy(), lambda u: pd.to_numeric(u, errors='coerce'), np.nan)
+    experience = experience.astype(float)
+    reject(~np.isnan(experience) & ~((experience >= 0) & (experience <= MAX_YEARS)), f'Total_Experience outside 0-{MAX_YEARS}')
+    out['Tenure_Years'] = tenure
+    out['Total_Experience'] = np.where(np.isnan(experience), tenure, experience)
+    out['Join_Month'] = month_ordinal(join.fillna(as_of)).to_numpy()
+    out['Exit_Month'] = exit_month(out['Resignation_Date']).to_numpy()
+    out['Rating'] = np.round(out['Compliance_Score'] / 20, 1)
+
+    # Last, so only a row that is otherwise valid claims its Emp_ID
+    candidate = failed == 0
+    repeated = np.zeros(n, dtype=bool)
+    repeated[candidate] = pd.Series(out['Emp_ID'][candidate]).duplicated().to_numpy()
+    if seen_ids is not None and len(seen_ids):
+        at = np.minimum(np.searchsorted(seen_ids, out['Emp_ID']), len(seen_ids) - 1)
+        repeated |= seen_ids[at] == out['Emp_ID']
+    reject(repeated, 'duplicate Emp_ID')
+
+    keep = failed == 0
+    return {col: values[keep] for col, values in out.items()}, np.array(messages, dtype=object)[failed]
+
+
+def load_extract(path, chunk_rows=CHUNK_ROWS, rejects_path=None, as_of=None):
+    """
+    Streams an HRMS extract into the compact workforce frame. Returns (df, report)
+    where report counts read / loaded rows and rejected rows per reason.
+    """
+    as_of = pd.Timestamp(as_of or datetime.now().date())
+    codebooks = {col: _CodeBook(CATEGORICAL_COLUMNS[col][0])
+                 for col in COLUMN_ORDER if col in CATEGORICAL_COLUMNS and col != 'Join_Month_Year'}
+    parts = {}
+    reasons = Counter()
+    rows_read = 0
+    rejects_written = False
+    seen_ids = np.empty(0, dtype=np.int32)
+
+    for chunk in _iter_chunks(path, chunk_rows):
+        missing = [c for c in REQUIRED_COLUMNS if c not in chunk]
+        if missing:
+            raise ValueError(f"{path} is missing required columns: {', '.join(missing)}")
+        accepted, chunk_reasons = _convert_chunk(chunk, codebooks, as_of, seen_ids)
+        seen_ids = np.sort(np.concatenate([seen_ids, accepted['Emp_ID']]), kind='stable')
+        for col, values in accepted.items():
+            parts.setdefault(col, []).append(values)
+        rejected = pd.notna(chunk_reasons)
+        reasons.update(chunk_reasons[rejected])
+        if rejects_path and rejected.any():
+            bad_rows = chunk[rejected].assign(Reject_Reason=chunk_reasons[rejected], Row=rows_read + np.flatnonzero(rejected) + 1)
+            bad_rows.to_csv(rejects_path, mode='a' if rejects_written else 'w', header=not rejects_written, index=False)
+            rejects_written = True
+        rows_read += len(chunk)
+
+    # Assemble column by column so only one column exists twice (chunks + joined) at a time
+    columns = {}
+    for col in COLUMN_ORDER:
+        chunks = parts.pop(col, None)
+        if chunks is None:
+            continue
+        values = np.concatenate(chunks)
+        del chunks
+        columns[col] = codebooks[col].categorical(values, col) if col in codebooks else values
+    df = pd.DataFrame(columns, copy=False)
+    del columns
+
+    df['Join_Month_Year'] = month_label(df['Join_Month'])
+    df = df[COLUMN_ORDER]
+    for col, dtype in NUMERIC_COLUMNS.items():
+        df[col] = df[col].astype(dtype)
+
+    report = {'rows_read': rows_read, 'rows_loaded': len(df), 'rejected': dict(reasons.most_common())}
+    return df, report
+
+
+def print_report(path, report):
+    print(f"Loaded {report['rows_loaded']:,} of {report['rows_read']:,} rows from {path}")
+    for reason, count in report['rejected'].items():
+        print(f"  rejected {count:,}: {reason}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Validate and load an HRMS extract (CSV or Parquet).")
+    parser.add_argument("path")
+    parser.add_argument("--rejects", help="Write rejected rows (with the reason) to this CSV")
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS)
+    args = parser.parse_args(argv)
+    df, report = load_extract(args.path, args.chunk_rows, args.rejects)
+    print_report(args.path, report)
+    print(f"Frame: {memory_report(df)['Bytes'].iloc[-1] / 1e6:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+# data/quantiles.py
+"""
+Experience and tenure distributions per Zone x Grade, for the box plots.
+
+Both columns are in years to one decimal, so the distribution of a cell is a
+count per 0.1-year step from 0 to MAX_YEARS: a dense (Zone x Grade x step)
+array per column, built once at load time. The grid is fixed, so a stray
+value (a bad extract row, a mistyped date) can't blow up the array: values
+outside it are counted in the first or last step. Cells merge by adding their counts, events add or
+remove single counts (like the monthly flows), and the quartiles, whiskers
+and outliers of any selection are read off the merged counts, so their cost
+depends on the number of steps, not on headcount. Values finer than a step
+are rounded to it.
+
+The stats follow plotly.js' box defaults (quartilemethod 'linear', whiskers
+at the furthest values within 1.5 IQR of the box), so a box drawn from them
+is the one plotly would compute from the rows.
+"""
+import numpy as np
+import pandas as pd
+from data.series import category_codes
+from data.schema import MAX_YEARS
+
+QUANTILE_DIMENSIONS = ('Zone', 'Grade')
+QUANTILE_COLUMNS = ('Total_Experience', 'Tenure_Years')
+STEP = 0.1
+# Float slack when placing a fence on the step grid
+_EPSILON = 1e-9
+
+
+class QuantileSketch:
+    def __init__(self, df, columns=QUANTILE_COLUMNS, dimensions=QUANTILE_DIMENSIONS, step=STEP, max_value=MAX_YEARS):
+        self.dimensions = list(dimensions)
+        self.columns = list(columns)
+        self.step = step
+        self.size = int(round(max_value / step)) + 1
+        self.categories = [list(df[d].cat.categories) for d in self.dimensions]
+        shape = [len(c) for c in self.categories] + [self.size]
+        self.counts = {column: np.zeros(shape, dtype=np.int64) for column in self.columns}
+        self.add(df)
+
+    def _steps(self, values):
+        """
+        (mask of the non-missing values, their step on the grid, clamped to it).
+        """
+        values = values.to_numpy(dtype=float)
+        present = ~np.isnan(values)
+        steps = np.rint(np.clip(values[present], 0, (self.size - 1) * self.step) / self.step)
+        return present, steps.astype(np.int64)
+
+    def _grow(self, column):
+        # New category values pad the array
+        counts = self.counts[column]
+        pad = [(0, len(c) - size) for c, size in zip(self.categories, counts.shape)] + [(0, 0)]
+        if any(p != (0, 0) for p in pad):
+            self.counts[column] = np.pad(counts, pad)
+
+    def add(self, rows, sign=1):
+        """
+        Adds (sign=1) or removes (sign=-1) the values of `rows`.
+        """
+        codes = category_codes(rows, self.dimensions, self.categories)
+        for column in self.columns:
+            present, steps = self._steps(rows[column])
+            self._grow(column)
+            at = tuple(c[present] for c in codes) + (steps,)
+            np.add.at(self.counts[column], at, sign)
+
+    def merged(self, column, filters=None, by='Grade'):
+        """
+        (groups, counts): the counts of `column` for {column: [values]} merged
+        per value of `by`, one row per group with at least one value.
+        """
+        counts = self.counts[column]
+        groups = self.categories[self.dimensions.index(by)]
+        for axis, (d, categories) in enumerate(zip(self.dimensions, self.categories)):
+            values = (filters or {}).get(d)
+            if values:
+                keep = [i for i, c in enumerate(categories) if c in values]
+                counts = counts.take(keep, axis=axis)
+                if d == by:
+                    groups = [groups[i] for i in keep]
+        axis = self.dimensions.index(by)
+        counts = np.moveaxis(counts, axis, 0)
+        counts = counts.reshape(len(groups), -1, counts.shape[-1]).sum(axis=1)
+        nonempty = counts.sum(axis=1) > 0
+        return [g for g, keep in zip(groups, nonempty) if keep], counts[nonempty]
+
+    def box_stats(self, column, filters=None, by='Grade'):
+        """
+        One row per group of `by` for {column: [values]}: Count, Q1, Median,
+        Q3, Lower_Fence, Upper_Fence and Outliers (the distinct values beyond
+        the fences, as a tuple).
+        """
+        groups, counts = self.merged(column, filters, by)
+        records = []
+        for group, row in zip(groups, counts):
+            occupied = np.flatnonzero(row)
+            stats = box_steps(row, occupied)
+            outliers = occupied[(occupied < stats['Lower_Fence']) | (occupied > stats['Upper_Fence'])]
+            record = {key: self._value(value) for key, value in stats.items()}
+            records.append({
+                by: group, 'Count': int(row.sum()), **record,
+                'Outliers': tuple(self._value(outliers)),
+            })
+        columns = [by, 'Count', 'Q1', 'Median', 'Q3', 'Lower_Fence', 'Upper_Fence', 'Outliers']
+        return pd.DataFrame(records, columns=columns)
+
+    def _value(self, steps):
+        # Back to the column's unit, without the float noise of the multiplication
+        return np.round(np.asarray(steps, dtype=float) * self.step, 6).tolist()
+
+
+def box_steps(counts, occupied=None):
+    """
+    Quartiles and whiskers, on the step grid, of the values counted in
+    `counts` (counts[i] values at step i). Mirrors plotly.js' box calc:
+    Lib.interp for the quartiles, the last value inside 1.5 IQR for the fences.
+    """
+    occupied = np.flatnonzero(counts) if occupied is None else occupied
+    cumulative = np.cumsum(counts[occupied])
+    n = int(cumulative[-1])
+
+    def order_statistic(k):
+        # The k-th smallest value (0-based)
+        return int(occupied[np.searchsorted(cumulative, k, side='right')])
+
+    def interp(p):
+        position = p * n - 0.5
+        if position < 0:
+            return order_statistic(0)
+        if position > n - 1:
+            return order_statistic(n - 1)
+        frac = position % 1
+        return frac * order_statistic(int(np.ceil(position))) + (1 - frac) * order_statistic(int(np.floor(position)))
+
+    q1, median, q3 = interp(0.25), interp(0.5), interp(0.75)
+    low = occupied[occupied >= np.ceil(2.5 * q1 - 1.5 * q3 - _EPSILON)]
+    high = occupied[occupied <= np.floor(2.5 * q3 - 1.5 * q1 + _EPSILON)]
+    return {
+        'Q1': q1, 'Median': median, 'Q3': q3,
+        'Lower_Fence': min(q1, low[0]) if len(low) else q1,
+        'Upper_Fence': max(q3, high[-1]) if len(high) else q3,
+    }
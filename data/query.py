@@ -0,0 +1,124 @@
+# data/query.py
+"""
+Server-side filtering, sorting and paging for DataTables in custom mode.
+
+Filters use the DataTable `filter_query` syntax ({col} op value joined by &&).
+Conditions on categorical columns are evaluated once per category and mapped
+back through the codes, and sorting uses the category codes, so neither step
+touches per-row strings.
+"""
+import re
+import numpy as np
+import pandas as pd
+from data.schema import EMP_ID_PREFIX, format_emp_id
+
+# Longest first so '>=' wins over '>'
+OPERATORS = {
+    '>=': 'ge', '<=': 'le', '!=': 'ne', '>': 'gt', '<': 'lt', '=': 'eq',
+    'eq': 'eq', 'ne': 'ne', 'gt': 'gt', 'ge': 'ge', 'lt': 'lt', 'le': 'le',
+    'contains': 'contains', 'datestartswith': 'startswith',
+}
+_TERM = re.compile(
+    r"^\{(?P<col>[^}]+)\}\s+(?P<case>[is]?)(?P<op>" + "|".join(re.escape(o) for o in sorted(OPERATORS, key=len, reverse=True)) +
+    r")\s+(?P<value>.+)$"
+)
+
+
+def parse_filter_query(query):
+    """
+    '{Name} icontains raj && {Compliance_Score} > 80' ->
+    [('Name', 'contains', 'raj', False), ('Compliance_Score', 'gt', '80', True)]
+    Terms that don't parse are ignored.
+    """
+    terms = []
+    for part in (query or '').split(' && '):
+        match = _TERM.match(part.strip())
+        if not match:
+            continue
+        value = match['value'].strip()
+        if len(value) >= 2 and value[0] == value[-1] and value[0] in "\"'`":
+            value = value[1:-1]
+        terms.append((match['col'], OPERATORS[match['op']], value, match['case'] != 'i'))
+    return terms
+
+
+def _compare(values, op, value, case_sensitive):
+    """
+    Vectorized condition on a Series of values (rows or categories).
+    """
+    if pd.api.types.is_numeric_dtype(values) and op not in ('contains', 'startswith'):
+        number = pd.to_numeric(value, errors='coerce')
+        if pd.isna(number):
+            return np.zeros(len(values), dtype=bool)
+        return getattr(values, op)(number).to_numpy()
+    text = values.astype(str)
+    if not case_sensitive:
+        text, value = text.str.lower(), value.lower()
+    if op == 'contains':
+        return text.str.contains(value, regex=False).to_numpy()
+    if op == 'startswith':
+        return text.str.startswith(value).to_numpy()
+    return getattr(text, op)(value).to_numpy()
+
+
+def filter_mask(df, filter_query):
+    """
+    Boolean row mask for a DataTable filter_query, or None if it has no terms.
+    """
+    mask = None
+    for col, op, value, case_sensitive in parse_filter_query(filter_query):
+        if col not in df:
+            continue
+        series = df[col]
+        if col == 'Emp_ID':
+            # Users type the display form ('FM-50012'); compare on the integer when possible
+            if op != 'contains' and value.upper().startswith(EMP_ID_PREFIX):
+                value = value[len(EMP_ID_PREFIX):]
+            elif op == 'contains':
+                series = format_emp_id(series)
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            categories = pd.Series(series.cat.categories)
+            # Code -1 (missing) indexes the trailing False
+            lookup = np.append(_compare(categories, op, value, case_sensitive), False)
+            term = lookup[series.cat.codes.to_numpy()]
+        else:
+            term = _compare(series.reset_index(drop=True), op, value, case_sensitive)
+        mask = term if mask is None else mask & term
+    return mask
+
+
+def _sort_key(series, descending):
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        key = series.cat.codes.to_numpy().astype(np.int32)
+    else:
+        key = series.to_numpy()
+        if key.dtype.kind == 'M':
+            key = key.view('int64')
+        elif key.dtype.kind == 'b':
+            key = key.astype(np.int8)
+    return -key if descending else key
+
+
+def query_rows(df, filter_query=None, sort_by=None):
+    """
+    Row positions of `df` that pass the filter, in the requested sort order.
+    """
+    mask = filter_mask(df, filter_query)
+    rows = np.arange(len(df)) if mask is None else np.flatnonzero(mask)
+    sort_by = [s for s in (sort_by or []) if s.get('column_id') in df]
+    if sort_by and len(rows):
+        # np.lexsort treats the last key as primary
+        keys = [_sort_key(df[s['column_id']].iloc[rows], s.get('direction') == 'desc') for s in reversed(sort_by)]
+        rows = rows[np.lexsort(keys)]
+    return rows
+
+
+def page_of(df, filter_query=None, sort_by=None, page_current=0, page_size=10, columns=None):
+    """
+    One page of the filtered/sorted frame, projected to `columns`, plus the page count.
+    """
+    rows = query_rows(df, filter_query, sort_by)
+    page_count = max(int(np.ceil(len(rows) / page_size)), 1)
+    start = (page_current or 0) * page_size
+    page = df.iloc[rows[start:start + page_size]]
+    return (page if columns is None else page[columns]), page_count
@@ -0,0 +1,180 @@
+# data/schema.py
+"""
+Compact column schema for the workforce frame.
+
+Low-cardinality text columns are pandas categoricals (int8/int16 codes plus a
+small dictionary), Emp_ID is an integer, and join months are int month
+ordinals. The display strings stay available through the categories,
+`format_emp_id` and `Join_Month_Year`.
+
+    python -m data.schema    # memory report for the configured dataset
+"""
+import numpy as np
+import pandas as pd
+
+EMP_ID_PREFIX = "FM-"
+
+# Exit_Month of employees who haven't left
+NO_EXIT = -1
+# Upper bound for experience / tenure in years; longer values are data errors
+MAX_YEARS = 60
+
+# Fixed vocabularies. Ordered ones sort (and plot) in business order.
+ZONES = ['North', 'South', 'East', 'West']
+GRADES = ['L1 (Associate)', 'L2 (Skilled)', 'L3 (Supervisor)', 'L4 (Manager)', 'L5 (Director)']
+STATUSES = ['Active', 'Resigned']
+GENDERS = ['Male', 'Female']
+SHIFTS = ['General', 'Morning', 'Evening', 'Night']
+EDUCATION_LEVELS = ['10th Pass', '12th Pass', 'Diploma', 'ITI', 'Graduate', 'MBA']
+YES_NO = ['No', 'Yes']
+
+# Column -> (categories or None to infer from the data, ordered)
+CATEGORICAL_COLUMNS = {
+    'Zone': (ZONES, False),
+    'Grade': (GRADES, True),
+    'Status': (STATUSES, False),
+    'Gender': (GENDERS, False),
+    'Shift': (SHIFTS, False),
+    'Education': (EDUCATION_LEVELS, True),
+    'Software_User': (YES_NO, False),
+    'Role': (None, False),
+    'Department': (None, False),
+    'Site_Name': (None, False),
+    'City': (None, False),
+    'State': (None, False),
+    'Category': (None, False),
+    'Primary_Skill': (None, False),
+    'Name': (None, False),
+    'Join_Month_Year': (None, True),
+}
+
+NUMERIC_COLUMNS = {
+    'Emp_ID': 'int32',
+    'Join_Month': 'int32',
+    'Exit_Month': 'int32',
+    'Compliance_Score': 'int8',
+    'Is_High_Profile': 'bool',
+}
+
+
+def month_ordinal(dates):
+    """
+    Months since year 0 (year * 12 + month - 1) for a datetime Series.
+    """
+    return (dates.dt.year * 12 + dates.dt.month - 1).astype('int32')
+
+
+def exit_month(resignation_dates):
+    """
+    Month ordinal of each resignation, NO_EXIT where there is none.
+    """
+    dates = pd.Series(resignation_dates)
+    return (dates.dt.year * 12 + dates.dt.month - 1).fillna(NO_EXIT).astype('int32')
+
+
+def month_label(ordinals):
+    """
+    'YYYY-MM' labels for month ordinals, built once per distinct month.
+    """
+    months, codes = np.unique(np.asarray(ordinals), return_inverse=True)
+    labels = [f"{m // 12}-{m % 12 + 1:02d}" for m in months]
+    return pd.Categorical.from_codes(codes.reshape(-1), categories=labels, ordered=True)
+
+
+def parse_emp_id(values):
+    """
+    'FM-50012' -> 50012. Integers pass through unchanged.
+    """
+    s = pd.Series(values)
+    if pd.api.types.is_integer_dtype(s):
+        return s.astype('int32')
+    return pd.to_numeric(s.astype(str).str.replace(EMP_ID_PREFIX, '', regex=False), errors='coerce')
+
+
+def format_emp_id(values):
+    """
+    50012 -> 'FM-50012' for display.
+    """
+    return EMP_ID_PREFIX + pd.Series(values).astype(str)
+
+
+def categorical(values, column):
+    """
+    Builds the schema categorical for `column` from raw values.
+    """
+    categories, ordered = CATEGORICAL_COLUMNS[column]
+    if categories is None:
+        categories = sorted(pd.unique(pd.Series(values).dropna()))
+    return pd.Categorical(values, categories=categories, ordered=ordered)
+
+
+def from_codes(codes, values, column):
+    """
+    Categorical for `column` from integer positions into `values` (a small
+    lookup list, duplicates allowed), with the schema's category order.
+    """
+    lookup = categorical(values, column)
+    return pd.Categorical.from_codes(lookup.codes[codes], dtype=lookup.dtype)
+
+
+def apply_schema(df):
+    """
+    Converts a frame with plain string/object columns to the compact schema.
+    Columns that are already compact are left untouched.
+    """
+    if 'Emp_ID' in df and not pd.api.types.is_integer_dtype(df['Emp_ID']):
+        df['Emp_ID'] = parse_emp_id(df['Emp_ID']).to_numpy()
+    if 'Join_Date' in df:
+        df['Join_Month'] = month_ordinal(df['Join_Date'])
+        df['Join_Month_Year'] = month_label(df['Join_Month'])
+    if 'Resignation_Date' in df:
+        df['Exit_Month'] = exit_month(pd.to_datetime(df['Resignation_Date'])).to_numpy()
+    for col in CATEGORICAL_COLUMNS:
+        if col in df and not isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = categorical(df[col], col)
+    for col, dtype in NUMERIC_COLUMNS.items():
+        if col in df and df[col].dtype != dtype:
+            df[col] = df[col].astype(dtype)
+    return df
+
+
+def memory_report(df):
+    """
+    Per-column memory usage (deep), largest first, with a total row.
+    """
+    usage = df.memory_usage(deep=True, index=False)
+    report = pd.DataFrame({
+        'Column': usage.index,
+        'Dtype': [str(df[c].dtype) for c in usage.index],
+        'Bytes': usage.to_numpy(),
+    }).sort_values('Bytes', ascending=False)
+    report['Bytes_Per_Row'] = (report['Bytes'] / max(len(df), 1)).round(2)
+    total = pd.DataFrame([{'Column': 'TOTAL', 'Dtype': '', 'Bytes': report['Bytes'].sum(),
+                           'Bytes_Per_Row': round(report['Bytes'].sum() / max(len(df), 1), 2)}])
+    return pd.concat([report, total], ignore_index=True)
+
+
+def as_object_frame(df):
+    """
+    The plain-string representation of a compact frame (what the engine used to
+    produce); only used to compare memory footprints.
+    """
+    out = df.copy()
+    for col in out.columns:
+        if isinstance(out[col].dtype, pd.CategoricalDtype):
+            out[col] = out[col].astype(object)
+    if 'Emp_ID' in out:
+        out['Emp_ID'] = format_emp_id(out['Emp_ID']).to_numpy()
+    return out.drop(columns=['Join_Month', 'Exit_Month'], errors='ignore')
+
+
+if __name__ == "__main__":
+    from data.engine import load_data
+    df, _ = load_data()
+    compact = memory_report(df)
+    legacy = memory_report(as_object_frame(df))
+    pd.set_option('display.width', 120)
+    print(compact.to_string(index=False))
+    ratio = legacy['Bytes'].iloc[-1] / compact['Bytes'].iloc[-1]
+    print(f"\nObject-string layout: {legacy['Bytes'].iloc[-1] / 1e6:.1f} MB, "
+          f"compact: {compact['Bytes'].iloc[-1] / 1e6:.1f} MB ({ratio:.1f}x smaller)")
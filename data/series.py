@@ -0,0 +1,126 @@
+# data/series.py
+"""
+Monthly joiner / leaver counts and the workforce time series built on them.
+
+A dense (Zone x Grade x month) array of hires and exits, built once at load
+time. The trend charts sum the slice for the sidebar filters, so their cost
+depends on the number of months, not on headcount, and new events are added
+with a couple of array increments. Headcount and rolling attrition are
+cumulative sums over the same monthly counts (join = +1, exit = -1).
+"""
+import numpy as np
+import pandas as pd
+from data.schema import NO_EXIT
+
+FLOW_DIMENSIONS = ('Zone', 'Grade')
+ROLLING_MONTHS = 12
+
+
+def category_codes(rows, dimensions, categories):
+    """
+    Position of each row along every dimension in `categories` (one list per
+    dimension), appending the category values `categories` hasn't seen yet.
+    """
+    codes = []
+    for d, known in zip(dimensions, categories):
+        for value in rows[d].cat.categories.difference(known, sort=False):
+            known.append(value)
+        lookup = {value: code for code, value in enumerate(known)}
+        remap = np.array([lookup[value] for value in rows[d].cat.categories], dtype=np.int64)
+        codes.append(remap[rows[d].cat.codes.to_numpy()])
+    return codes
+
+
+class MonthlyFlows:
+    def __init__(self, df, dimensions=FLOW_DIMENSIONS):
+        self.dimensions = list(dimensions)
+        self.categories = [list(df[d].cat.categories) for d in self.dimensions]
+        exits = df['Exit_Month'].to_numpy()
+        months = np.concatenate([df['Join_Month'].to_numpy(), exits[exits != NO_EXIT]])
+        self.start = int(months.min()) if len(months) else 0
+        last = int(months.max()) if len(months) else self.start
+        shape = [len(c) for c in self.categories] + [last - self.start + 1]
+        self.hires = np.zeros(shape, dtype=np.int64)
+        self.exits = np.zeros(shape, dtype=np.int64)
+        self.add(df)
+
+    def _grow(self, months):
+        # New category values / months outside the current range pad the arrays
+        pad = [(0, len(c) - size) for c, size in zip(self.categories, self.hires.shape)]
+        before = max(self.start - int(months.min()), 0) if len(months) else 0
+        after = max(int(months.max()) - (self.start + self.hires.shape[-1] - 1), 0) if len(months) else 0
+        pad.append((before, after))
+        if any(p != (0, 0) for p in pad):
+            self.hires = np.pad(self.hires, pad)
+            self.exits = np.pad(self.exits, pad)
+            self.start -= before
+
+    def add(self, rows, sign=1):
+        """
+        Adds (sign=1) or removes (sign=-1) the hires and exits of `rows`.
+        """
+        codes = category_codes(rows, self.dimensions, self.categories)
+        join = rows['Join_Month'].to_numpy(dtype=np.int64)
+        exit_month = rows['Exit_Month'].to_numpy(dtype=np.int64)
+        left = (exit_month != NO_EXIT) & (rows['Status'] == 'Resigned').to_numpy()
+        exit_month = exit_month[left]
+        self._grow(np.concatenate([join, exit_month]))
+        np.add.at(self.hires, tuple(codes) + (join - self.start,), sign)
+        np.add.at(self.exits, tuple(c[left] for c in codes) + (exit_month - self.start,), sign)
+
+    def totals(self, filters=None):
+        """
+        Hires and exits per month (every month from `start`) for {column: [values]}.
+        """
+        hires, exits = self.hires, self.exits
+        for axis, (d, categories) in enumerate(zip(self.dimensions, self.categories)):
+            values = (filters or {}).get(d)
+            if values:
+                keep = [i for i, c in enumerate(categories) if c in values]
+                hires, exits = hires.take(keep, axis=axis), exits.take(keep, axis=axis)
+        axes = tuple(range(len(self.dimensions)))
+        return hires.sum(axis=axes), exits.sum(axis=axes)
+
+    def frame(self, filters=None):
+        """
+        Hires and exits per month for {column: [values]}, months without
+        either dropped.
+        """
+        hires, exits = self.totals(filters)
+        out = pd.DataFrame({
+            'Month': np.arange(self.start, self.start + len(hires)),
+            'Joined': hires,
+            'Exited': exits,
+        })
+        return out[(out['Joined'] > 0) | (out['Exited'] > 0)].reset_index(drop=True)
+
+    def timeline(self, filters=None, window=ROLLING_MONTHS):
+        """
+        Month-by-month series for {column: [values]}: joiners, leavers, net
+        change, active headcount at month end and the rolling `window`-month
+        attrition rate (exits in the window over the average headcount, in %;
+        NaN until a full window of history exists).
+        """
+        hires, exits = self.totals(filters)
+        joined, left = np.cumsum(hires), np.cumsum(exits)
+        headcount = joined - left
+
+        def trailing(cumulative):
+            # Sum over the last `window` months from a cumulative sum
+            out = cumulative.astype(float)
+            out[window:] -= cumulative[:-window]
+            return out
+
+        window_exits = trailing(left)
+        average_headcount = trailing(np.cumsum(headcount)) / window
+        rate = np.full(len(hires), np.nan)
+        full = (np.arange(len(hires)) >= window - 1) & (average_headcount > 0)
+        rate[full] = np.round(window_exits[full] / average_headcount[full] * 100, 1)
+        return pd.DataFrame({
+            'Month': np.arange(self.start, self.start + len(hires)),
+            'Joined': hires,
+            'Exited': exits,
+            'Net_Change': hires - exits,
+            'Headcount': headcount,
+            'Attrition_Rate': rate,
+        })
@@ -1,38 +1,154 @@
-import geopandas as gpd
+"""
+Build step for the map geometry.
+
+Writes several levels of detail of the state boundaries, each simplified with
+its own tolerance and with coordinates quantized to a fixed number of decimals,
+plus a manifest (levels.json) with a size / vertex-count / parse-time report
+and per-state bounding boxes. The app serves the lightest level that fits the
+current map view (see data/geo.py).
+
+    python data/simplify_map.py                       # default levels from the optimized file
+    python data/simplify_map.py --input india_states.geojson \\
+        --level country:0.05:2:4 --level zone:0.01:3:6 --level detail:0.002:4:99
+
+The app only serves the GeoJSON levels. --topojson also writes an arc-shared
+TopoJSON file per level (needs the topojson package) to compare sizes; those
+files are not committed.
+"""
+import argparse
+import json
 import os
+import sys
+import time
+
+import geopandas as gpd
+import numpy as np
+import shapely
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BASE_DIR))
+from data.geo import LEVELS_DIR, MANIFEST_FILE, STATE_NAME_FIXES
 
 # Paths
-INPUT_FILE = "/home/parzival/analytics/data/india_states.geojson"
-OUTPUT_FILE = "/home/parzival/analytics/data/india_states_optimized.geojson"
+DEFAULT_INPUTS = [
+    os.path.join(BASE_DIR, "india_states.geojson"),            # full resolution source, if present
+    os.path.join(BASE_DIR, "india_states_optimized.geojson"),  # already simplified at 0.01 deg
+]
+
+# name:tolerance(deg):decimals:max_zoom. 0.01 degrees is roughly 1km, and 2 decimals ~1.1km.
+DEFAULT_LEVELS = ["country:0.05:2:4", "zone:0.01:3:99"]
+
+
+def parse_level(spec):
+    name, tolerance, decimals, max_zoom = spec.split(":")
+    return {'name': name, 'tolerance': float(tolerance), 'decimals': int(decimals), 'max_zoom': float(max_zoom)}
+
+
+def count_vertices(geoms):
+    return int(shapely.get_num_coordinates(np.asarray(geoms)).sum())
+
 
-def simplify_geojson():
-    print(f"Reading {INPUT_FILE}...")
+def build_level(gdf, level, key_property):
+    """
+    Simplifies, quantizes and serializes one level of detail. Returns the GeoJSON text.
+    """
+    out = gdf[[key_property, 'geometry']].copy()
+    # Simplify
+    out['geometry'] = out.simplify(tolerance=level['tolerance'], preserve_topology=True)
+    # Quantize: snap to the decimal grid (drops vertices that collapse onto each other), then trim the floats
+    grid = 10 ** -level['decimals']
+    out['geometry'] = shapely.set_precision(out.geometry.values, grid_size=grid)
+    out['geometry'] = shapely.transform(out.geometry.values, lambda c: np.round(c, level['decimals']))
+    out = out[~out.geometry.is_empty]
+    return out, out.to_json(drop_id=True, separators=(',', ':'))
+
+
+def write_topojson(gdf, decimals, path):
+    """
+    Optional arc-shared (TopoJSON) encoding: borders between neighbouring states are
+    stored once, as delta-encoded integers on a grid as fine as the level's decimals.
+    """
     try:
-        if not os.path.exists(INPUT_FILE):
-             print(f"Error: {INPUT_FILE} does not exist.")
-             return
-
-        gdf = gpd.read_file(INPUT_FILE)
-        print(f"Original CRS: {gdf.crs}")
-        print(f"Original number of points (approx): {sum([len(geom.exterior.coords) for geom in gdf.geometry if geom.geom_type == 'Polygon'])}") # Basic complexity check
-        
-        # Simplify
-        # Tolerance is in degrees (since map is likely 4326). 
-        # 0.01 degrees is roughly 1km, which is fine for visual state boundaries.
-        print("Simplifying geometry...")
-        gdf['geometry'] = gdf.simplify(tolerance=0.01, preserve_topology=True)
-        
-        # Save
-        print(f"Saving to {OUTPUT_FILE}...")
-        gdf.to_file(OUTPUT_FILE, driver='GeoJSON')
-        
-        # Stats
-        original_size = os.path.getsize(INPUT_FILE) / (1024 * 1024)
-        new_size = os.path.getsize(OUTPUT_FILE) / (1024 * 1024)
-        print(f"Success! Reduced size from {original_size:.2f} MB to {new_size:.2f} MB")
-        
+        import topojson
+    except ImportError:
+        print("  topojson package not installed, skipping topology encoding (pip install topojson)")
+        return None
+    min_x, min_y, max_x, max_y = gdf.total_bounds
+    grid_steps = int(max(max_x - min_x, max_y - min_y) * 10 ** decimals) + 1
+    topo = topojson.Topology(gdf, prequantize=grid_steps, toposimplify=False)
+    with open(path, 'w') as f:
+        f.write(topo.to_json())
+    return os.path.getsize(path)
+
+
+def simplify_geojson(input_file=None, output_dir=LEVELS_DIR, levels=DEFAULT_LEVELS, key_property='NAME_1', topojson=False):
+    input_file = input_file or next((p for p in DEFAULT_INPUTS if os.path.exists(p)), DEFAULT_INPUTS[-1])
+    print(f"Reading {input_file}...")
+    if not os.path.exists(input_file):
+        print(f"Error: {input_file} does not exist.")
+        return None
+
+    gdf = gpd.read_file(input_file).to_crs(epsg=4326)
+    gdf[key_property] = gdf[key_property].replace(STATE_NAME_FIXES)
+    print(f"Original CRS: {gdf.crs}, {len(gdf)} features, {count_vertices(gdf.geometry.values):,} vertices")
+    os.makedirs(output_dir, exist_ok=True)
+
+    manifest = {'key_property': key_property, 'source': os.path.basename(input_file), 'levels': [], 'bounds': {}}
+    for spec in levels:
+        level = parse_level(spec) if isinstance(spec, str) else dict(spec)
+        out, text = build_level(gdf, level, key_property)
+        file_name = f"india_states.{level['name']}.geojson"
+        with open(os.path.join(output_dir, file_name), 'w') as f:
+            f.write(text)
+
+        start = time.perf_counter()
+        json.loads(text)
+        level.update({
+            'file': file_name,
+            'bytes': len(text.encode()),
+            'vertices': count_vertices(out.geometry.values),
+            'parse_ms': round((time.perf_counter() - start) * 1000, 2),
+        })
+        if topojson:
+            topo_name = f"india_states.{level['name']}.topojson"
+            topo_bytes = write_topojson(out, level['decimals'], os.path.join(output_dir, topo_name))
+            if topo_bytes is not None:
+                level.update({'topojson_file': topo_name, 'topojson_bytes': topo_bytes})
+        manifest['levels'].append(level)
+
+    # Lightest first, so the runtime can take the first level whose max_zoom fits
+    manifest['levels'].sort(key=lambda l: l['max_zoom'])
+    # Per-state bounding boxes (from the source geometry) for fitting the map to a selection
+    for name, geom in zip(gdf[key_property], gdf.geometry):
+        manifest['bounds'][name] = [round(float(v), 4) for v in geom.bounds]
+    with open(os.path.join(output_dir, MANIFEST_FILE), 'w') as f:
+        json.dump(manifest, f, indent=2)
+
+    # Report
+    source_bytes = os.path.getsize(input_file)
+    print(f"\n{'Level':<10}{'Tolerance':>10}{'Decimals':>9}{'Max zoom':>9}{'Size KB':>10}{'Vertices':>10}{'Parse ms':>10}{'TopoJSON KB':>13}")
+    for l in manifest['levels']:
+        topo = f"{l['topojson_bytes'] / 1024:.1f}" if 'topojson_bytes' in l else '-'
+        print(f"{l['name']:<10}{l['tolerance']:>10}{l['decimals']:>9}{l['max_zoom']:>9g}{l['bytes'] / 1024:>10.1f}{l['vertices']:>10,}{l['parse_ms']:>10}{topo:>13}")
+    print(f"Source: {source_bytes / 1024:.1f} KB. Manifest written to {os.path.join(output_dir, MANIFEST_FILE)}")
+    return manifest
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build multi-resolution map geometry for the Site Intel map.")
+    parser.add_argument("--input", help="Source GeoJSON (defaults to data/india_states.geojson, else the optimized file)")
+    parser.add_argument("--output-dir", default=LEVELS_DIR)
+    parser.add_argument("--level", action="append", dest="levels",
+                        help="name:tolerance:decimals:max_zoom (repeatable), e.g. country:0.05:2:4")
+    parser.add_argument("--key-property", default="NAME_1", help="Feature property matched against the State column")
+    parser.add_argument("--topojson", action="store_true", help="Also write an arc-shared TopoJSON file per level")
+    args = parser.parse_args(argv)
+    try:
+        simplify_geojson(args.input, args.output_dir, args.levels or DEFAULT_LEVELS, args.key_property, args.topojson)
     except Exception as e:
         print(f"Error during simplification: {e}")
+        sys.exit(1)
+
 
 if __name__ == "__main__":
-    simplify_geojson()
+    main()
@@ -0,0 +1,215 @@
+# data/snapshot.py
+"""
+On-disk snapshot of the engine output.
+
+The finished workforce frame is written as an uncompressed Arrow IPC (Feather v2)
+file so warm starts can memory-map it, and the preprocessed GeoJSON is written
+next to it. The columns are handed to pandas without copying, so processes
+that map the same snapshot (gunicorn workers) share one copy of the data in
+the page cache. Snapshots are keyed by generator config, seed, the generation date
+and the hashes of the source files, so any change to those rebuilds them.
+Writing a snapshot prunes the older keys of the same dataset (same size and
+seed, or same extract) and keeps at most KEEP_SNAPSHOTS in all, so other
+configurations (a rebuild at another size, the benchmark suite) don't evict
+the one the app starts from.
+
+Usage:
+    python -m data.snapshot rebuild [--employees N] [--seed S] [--source PATH]
+    python -m data.snapshot info
+    python -m data.snapshot clear
+"""
+import argparse
+import hashlib
+import json
+import logging
+import os
+import shutil
+from datetime import date
+
+from config import SNAPSHOT_DIR, NUM_EMPLOYEES, DATA_SEED, DATA_SOURCE
+
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+except ImportError:  # Snapshots are an optimisation; without pyarrow we just regenerate
+    pa = None
+
+log = logging.getLogger(__name__)
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+SOURCE_FILES = [
+    os.path.join(BASE_DIR, "engine.py"),
+    os.path.join(BASE_DIR, "schema.py"),
+    os.path.join(BASE_DIR, "india_states_optimized.geojson"),
+]
+KEEP_SNAPSHOTS = 4
+META_FILE = "meta.json"
+
+
+def _file_hash(path):
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            h.update(block)
+    return h.hexdigest()
+
+
+def snapshot_key(num_employees, seed):
+    """
+    Cache key for a generated dataset. The generator anchors dates on today,
+    so the date is part of the key as well.
+    """
+    parts = [f"n={num_employees}", f"seed={seed}", f"date={date.today().isoformat()}"]
+    parts += [_file_hash(p) for p in SOURCE_FILES if os.path.exists(p)]
+    return hashlib.sha256("|".join(parts).encode()).hexdigest()[:16]
+
+
+def source_key(path):
+    """
+    Cache key for a dataset loaded from an extract file. Size and mtime stand in
+    for a content hash, which would mean reading a multi-GB file on every start.
+    """
+    stat = os.stat(path)
+    parts = [os.path.abspath(path), str(stat.st_size), str(stat.st_mtime_ns), f"date={date.today().isoformat()}"]
+    parts += [_file_hash(p) for p in SOURCE_FILES + [os.path.join(BASE_DIR, "loaders.py")] if os.path.exists(p)]
+    return hashlib.sha256("|".join(parts).encode()).hexdigest()[:16]
+
+
+def dataset_key(num_employees=NUM_EMPLOYEES, seed=DATA_SEED, source=None):
+    """
+    (key, lineage) for a dataset. The lineage names the dataset across
+    regenerations, so a newer key can replace the older ones of the same dataset.
+    """
+    if source:
+        return source_key(source), f"source={os.path.abspath(source)}"
+    return snapshot_key(num_employees, seed), f"n={num_employees}|seed={seed}"
+
+
+def _paths(key):
+    folder = os.path.join(SNAPSHOT_DIR, key)
+    return folder, os.path.join(folder, "workforce.arrow"), os.path.join(folder, "india_states.json")
+
+
+def has_snapshot(key):
+    return os.path.exists(_paths(key)[1])
+
+
+def read_snapshot(key):
+    """
+    Returns (df, geojson) from a snapshot, or None if it is missing or unreadable.
+    The frame's columns are read-only views of the mapped file, except the few
+    Arrow can't hand over as-is (bit-packed booleans, dates with nulls).
+    """
+    if pa is None:
+        return None
+    folder, frame_path, geo_path = _paths(key)
+    if not os.path.exists(frame_path):
+        return None
+    try:
+        # split_blocks keeps one block per column instead of consolidating (copying) them
+        df = feather.read_table(frame_path, memory_map=True).to_pandas(split_blocks=True)
+        geojson = None
+        if os.path.exists(geo_path):
+            with open(geo_path, 'r') as f:
+                geojson = json.load(f)
+        return df, geojson
+    except Exception as e:
+        log.warning("snapshot unreadable, rebuilding", extra={'fields': {'key': key, 'error': e}})
+        return None
+
+
+def write_snapshot(key, df, geojson, lineage=None):
+    """
+    Atomically writes a snapshot and prunes the stale ones (see prune_snapshots).
+    """
+    if pa is None:
+        return
+    folder, frame_path, geo_path = _paths(key)
+    # Per-process temp dir: several workers may build the same snapshot at once
+    tmp = f"{folder}.{os.getpid()}.tmp"
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(tmp)
+    try:
+        feather.write_feather(df, os.path.join(tmp, os.path.basename(frame_path)), compression='uncompressed')
+        if geojson is not None:
+            with open(os.path.join(tmp, os.path.basename(geo_path)), 'w') as f:
+                json.dump(geojson, f, separators=(',', ':'))
+        with open(os.path.join(tmp, META_FILE), 'w') as f:
+            json.dump({'lineage': lineage}, f)
+        shutil.rmtree(folder, ignore_errors=True)
+        os.replace(tmp, folder)
+    except Exception as e:
+        log.warning("snapshot write failed", extra={'fields': {'key': key, 'error': e}})
+        shutil.rmtree(tmp, ignore_errors=True)
+        return
+    prune_snapshots(key, lineage)
+
+
+def _lineage(name):
+    try:
+        with open(os.path.join(SNAPSHOT_DIR, name, META_FILE)) as f:
+            return json.load(f).get('lineage')
+    except (OSError, ValueError):
+        return None
+
+
+def prune_snapshots(keep, lineage=None, limit=KEEP_SNAPSHOTS):
+    """
+    Removes the snapshots of `lineage` other than `keep`, then the oldest
+    ones beyond `limit`.
+    """
+    if not os.path.isdir(SNAPSHOT_DIR):
+        return
+    names = [n for n in os.listdir(SNAPSHOT_DIR) if n != keep and not n.endswith(".tmp")]
+    stale = [n for n in names if lineage is not None and _lineage(n) == lineage]
+    rest = sorted(set(names) - set(stale), key=lambda n: os.path.getmtime(os.path.join(SNAPSHOT_DIR, n)))
+    stale += rest[:max(len(rest) - (limit - 1), 0)]
+    for name in stale:
+        shutil.rmtree(os.path.join(SNAPSHOT_DIR, name), ignore_errors=True)
+
+
+def clear_snapshots(keep=None):
+    if not os.path.isdir(SNAPSHOT_DIR):
+        return
+    for name in os.listdir(SNAPSHOT_DIR):
+        if name != keep and not name.endswith(".tmp"):
+            shutil.rmtree(os.path.join(SNAPSHOT_DIR, name), ignore_errors=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m data.snapshot", description="Manage the Optick data snapshot cache.")
+    parser.add_argument("command", choices=["rebuild", "info", "clear"])
+    parser.add_argument("--employees", type=int, default=NUM_EMPLOYEES)
+    parser.add_argument("--seed", type=int, default=DATA_SEED)
+    parser.add_argument("--source", default=DATA_SOURCE, help="extract file (default: OPTICK_DATA_SOURCE)")
+    args = parser.parse_args(argv)
+
+    key, lineage = dataset_key(args.employees, args.seed, args.source)
+    dataset = f"source={args.source}" if args.source else f"n={args.employees} seed={args.seed}"
+    if args.command == "clear":
+        clear_snapshots()
+        print(f"Cleared {SNAPSHOT_DIR}")
+    elif args.command == "info":
+        folder, frame_path, _ = _paths(key)
+        state = "present" if os.path.exists(frame_path) else "missing"
+        print(f"Snapshot dir: {SNAPSHOT_DIR}")
+        print(f"Key for {dataset}: {key} ({state})")
+        if state == "present":
+            size = sum(os.path.getsize(os.path.join(folder, f)) for f in os.listdir(folder))
+            print(f"Size: {size / (1024 * 1024):.2f} MB")
+    else:
+        if pa is None:
+            raise SystemExit("pyarrow is required to write snapshots")
+        from data.engine import generate_workforce, load_geojson
+        if args.source:
+            from data.loaders import load_extract, print_report
+            df, report = load_extract(args.source)
+            print_report(args.source, report)
+        else:
+            df = generate_workforce(args.employees, args.seed)
+        write_snapshot(key, df, load_geojson(), lineage)
+        print(f"Snapshot {key} written to {SNAPSHOT_DIR}")
+
+
+if __name__ == "__main__":
+    main()
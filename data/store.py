@@ -0,0 +1,420 @@
+# data/store.py
+"""
+Live workforce state: the base frame plus everything derived from it.
+
+Hires, exits and transfers arrive as events. `apply_events` merges them per
+employee, writes the changed rows in place, appends the new ones, and hands
+the before/after rows to the filter index, the cube, the monthly flows and
+the quantile sketch so each of them moves only the affected contributions.
+Nothing is regenerated or regrouped, and every applied batch bumps `version`
+so caches keyed on it drop what was rendered from the old state.
+
+The first write moves the columns into buffers with spare rows (HEADROOM),
+so a batch writes its rows into them and republishes `df` as views over the
+filled part: its cost follows the batch, not the headcount. A frame taken
+from `store.df` earlier shares those buffers, so it sees later in-place
+updates of its rows (never the appended ones); copy it to keep a snapshot.
+
+    store = WorkforceStore(df)
+    store.apply_events([
+        {'type': 'hire', 'Name': 'Asha Rao', 'Role': 'Electrician', 'Gender': 'Female',
+         'Site_Name': 'Pune Data Center A', 'Education': 'ITI', 'Primary_Skill': 'Electrical Safety',
+         'Compliance_Score': 82},
+        {'type': 'exit', 'Emp_ID': 'FM-50012', 'Resignation_Date': '2026-10-01'},
+        {'type': 'transfer', 'Emp_ID': 50013, 'Site_Name': 'Mumbai Tech Campus B'},
+    ])
+"""
+import threading
+import numpy as np
+import pandas as pd
+from datetime import datetime
+from data.engine import ROLE_MAP, _role_grade
+from data.cube import WorkforceCube
+from data.filters import FilterIndex
+from data.series import MonthlyFlows
+from data.quantiles import QuantileSketch
+from data.schema import CATEGORICAL_COLUMNS, GRADES, NO_EXIT, parse_emp_id, month_label
+
+EVENT_TYPES = ('hire', 'exit', 'transfer', 'update')
+
+# Site attributes copied onto an employee row from the site master
+SITE_COLUMNS = ['City', 'State', 'Zone', 'Category', 'Is_High_Profile']
+
+# A new employee needs these; the rest have defaults or are derived
+HIRE_REQUIRED = ['Name', 'Role', 'Gender', 'Site_Name', 'Education', 'Primary_Skill', 'Compliance_Score']
+# Spare rows allocated past the current length when the frame moves into its
+# own buffers (or outgrows them), as a share of that length
+HEADROOM = 0.25
+
+HIRE_DEFAULTS = {'Shift': 'General', 'Software_User': 'No', 'Status': 'Active', 'Prior_Experience': 0}
+
+
+def _codes_dtype(n_categories):
+    # The codes dtype pandas gives a categorical with this many categories
+    for dtype in (np.int8, np.int16, np.int32):
+        if n_categories < np.iinfo(dtype).max:
+            return dtype
+    return np.int64
+
+
+def _event_record(event):
+    """
+    Field changes for one event, keyed by column.
+    """
+    fields = {k: v for k, v in event.items() if k != 'type'}
+    kind = event.get('type')
+    if kind not in EVENT_TYPES:
+        raise ValueError(f"Unknown event type: {kind!r} (expected one of {', '.join(EVENT_TYPES)})")
+    if kind != 'hire' and fields.get('Emp_ID') is None:
+        raise ValueError(f"A {kind} event needs an Emp_ID")
+    if kind == 'exit':
+        fields['Status'] = 'Resigned'
+        fields.setdefault('Resignation_Date', datetime.now().date())
+    elif kind == 'transfer' and 'Site_Name' not in fields:
+        raise ValueError("A transfer event needs a Site_Name")
+    return fields
+
+
+def _emp_id(value):
+    emp_id = parse_emp_id([value]).iloc[0]
+    if pd.isna(emp_id) or not 0 <= emp_id <= np.iinfo(np.int32).max:
+        raise ValueError(f"Invalid Emp_ID {value!r}")
+    return int(emp_id)
+
+
+def _timestamp(col, value):
+    try:
+        stamp = pd.Timestamp(value)
+    except (TypeError, ValueError):
+        stamp = pd.NaT
+    if pd.isna(stamp):
+        raise ValueError(f"Invalid {col} {value!r}")
+    return stamp
+
+
+def _is_number(value):
+    return isinstance(value, (int, float, np.integer, np.floating)) and not isinstance(value, (bool, np.bool_)) and not pd.isna(value)
+
+
+class WorkforceStore:
+    def __init__(self, df):
+        self.df = df
+        self.base_version = df.attrs.get('version')
+        self.revision = 0
+        self.filter_index = FilterIndex(df)
+        self.cube = WorkforceCube(df)
+        self.flows = MonthlyFlows(df)
+        self.quantiles = QuantileSketch(df)
+        self._lock = threading.Lock()
+        self._buffers = None
+        self._dtypes = None
+        self._capacity = 0
+        self._sites = None
+        self._ids = None
+        self._departments = {role: dept for dept, roles in ROLE_MAP.items() for role in roles}
+
+    @property
+    def version(self):
+        return self.base_version if not self.revision else f"{self.base_version}+{self.revision}"
+
+    # --- Lookups (built on first use) ---
+
+    def _sorted_ids(self):
+        """
+        (Emp_IDs in order, their row positions).
+        """
+        if self._ids is None:
+            ids = self.df['Emp_ID'].to_numpy()
+            order = np.argsort(ids, kind='stable')
+            self._ids = (ids[order], order)
+        return self._ids
+
+    def _positions(self, emp_ids):
+        """
+        Row position of each Emp_ID, -1 when the employee is not in the frame.
+        """
+        sorted_ids, order = self._sorted_ids()
+        emp_ids = np.asarray(emp_ids, dtype=sorted_ids.dtype)
+        at = np.minimum(np.searchsorted(sorted_ids, emp_ids), max(len(sorted_ids) - 1, 0))
+        found = (len(sorted_ids) > 0) & (sorted_ids[at] == emp_ids)
+        return np.where(found, order[at], -1)
+
+    def _site(self, fields):
+        if self._sites is None:
+            sites = self.df.drop_duplicates('Site_Name')
+            self._sites = {row['Site_Name']: {c: row[c] for c in SITE_COLUMNS} for _, row in sites.iterrows()}
+        site = fields['Site_Name']
+        if site not in self._sites:
+            missing = [c for c in ('City', 'State', 'Zone') if c not in fields]
+            if missing:
+                raise ValueError(f"New site {site!r} needs {', '.join(missing)}")
+            self._sites[site] = {'Category': 'Standard (Day)', 'Is_High_Profile': False,
+                                 **{c: fields[c] for c in SITE_COLUMNS if c in fields}}
+        return self._sites[site]
+
+    # --- Row building ---
+
+    def _complete(self, fields, current=None):
+        """
+        Fills the derived columns for a record: site attributes, department,
+        grade, join month, tenure/experience and rating. Checks the values the
+        way data/loaders.py checks an extract, raising ValueError.
+        """
+        out = dict(fields)
+        if 'Site_Name' in out:
+            out = {**self._site(out), **out}
+        if 'Role' in out and 'Department' not in out and out['Role'] in self._departments:
+            out['Department'] = self._departments[out['Role']]
+        if 'Role' in out and 'Grade' not in out and current is None:
+            # Manager roles start at L4
+            grade = _role_grade(out['Role'])
+            out['Grade'] = GRADES[3 if grade < 0 else grade]
+        for col in ('Join_Date', 'Resignation_Date'):
+            # Join_Date can't be cleared; Resignation_Date=None re-activates
+            if col in out and (out[col] is not None or col == 'Join_Date'):
+                out[col] = _timestamp(col, out[col])
+        join = out.get('Join_Date', current['Join_Date'] if current is not None else None)
+        left = out.get('Resignation_Date', current['Resignation_Date'] if current is not None else None)
+        if join is not None and left is not None and not pd.isna(left) and left < join:
+            raise ValueError(f"Resignation_Date {left.date()} is before Join_Date {join.date()}")
+        if 'Compliance_Score' in out:
+            score = out['Compliance_Score']
+            if not _is_number(score) or not 0 <= score <= 100:
+                raise ValueError(f"Compliance_Score must be a number between 0 and 100, got {score!r}")
+        if out.get('Prior_Experience') is not None:
+            prior = out['Prior_Experience']
+            if not _is_number(prior) or prior < 0:
+                raise ValueError(f"Prior_Experience must be a non-negative number, got {prior!r}")
+        if 'Resignation_Date' in out or current is None:
+            left = out.get('Resignation_Date')
+            out['Exit_Month'] = NO_EXIT if left is None else left.year * 12 + left.month - 1
+        if 'Join_Date' in out or 'Prior_Experience' in out:
+            tenure = round((pd.Timestamp(datetime.now().date()) - join).days / 365, 1)
+            prior = out.get('Prior_Experience')
+            if prior is None:
+                prior = current['Total_Experience'] - current['Tenure_Years']
+            out.update(Tenure_Years=tenure, Total_Experience=round(tenure + prior, 1),
+                       Join_Month=join.year * 12 + join.month - 1)
+        if 'Compliance_Score' in out:
+            out['Rating'] = round(out['Compliance_Score'] / 20, 1)
+        out.pop('Prior_Experience', None)
+        for col, value in out.items():
+            categories = CATEGORICAL_COLUMNS.get(col, (None, False))[0]
+            if categories is not None and value not in categories:
+                raise ValueError(f"{col} must be one of {', '.join(categories)}, got {value!r}")
+        return out
+
+    def _own(self, extra=0):
+        """
+        Moves the frame into private column buffers with spare rows (category
+        codes for categoricals), once and again when `extra` more rows won't
+        fit. The loaded frame may be shared (load_data's cache) or
+        memory-mapped from a snapshot, so it is never written to.
+        """
+        n = len(self.df)
+        if self._buffers is not None and n + extra <= self._capacity:
+            return
+        capacity = int((n + extra) * (1 + HEADROOM)) + 64
+        buffers, dtypes = {}, {}
+        for col in self.df.columns:
+            column = self.df[col]
+            dtypes[col] = column.dtype
+            values = column.cat.codes.to_numpy() if isinstance(column.dtype, pd.CategoricalDtype) else column.to_numpy()
+            buffers[col] = np.empty(capacity, dtype=values.dtype)
+            buffers[col][:n] = values
+        self._buffers, self._dtypes, self._capacity = buffers, dtypes, capacity
+
+    def _publish(self, n):
+        # The frame over the first n rows of the buffers, without copying them
+        columns = {}
+        for col, buffer in self._buffers.items():
+            dtype = self._dtypes[col]
+            if isinstance(dtype, pd.CategoricalDtype):
+                columns[col] = pd.Categorical.from_codes(buffer[:n], dtype=dtype, validate=False)
+            else:
+                columns[col] = buffer[:n]
+        attrs = dict(self.df.attrs)
+        self.df = pd.DataFrame(columns, copy=False)
+        self.df.attrs.update(attrs)
+
+    def _add_categories(self, col, new):
+        dtype = self._dtypes[col]
+        # Vocabularies stay sorted, as schema.categorical builds the inferred ones
+        # (fixed vocabularies never get new values: _complete rejects them)
+        updated = pd.CategoricalDtype(sorted(set(dtype.categories) | set(new)), ordered=dtype.ordered)
+        n = len(self.df)
+        buffer = self._buffers[col]
+        width = _codes_dtype(len(updated.categories))
+        shifted = list(updated.categories[:len(dtype.categories)]) != list(dtype.categories)
+        if shifted or buffer.dtype != width:
+            # New codes go to a new buffer: frames already handed out keep reading the old one
+            remap = np.append(updated.categories.get_indexer(dtype.categories), -1).astype(width)
+            recoded = np.empty(self._capacity, dtype=width)
+            recoded[:n] = remap[buffer[:n]]
+            self._buffers[col] = recoded
+        self._dtypes[col] = updated
+
+    def _ensure_categories(self, records):
+        for col in CATEGORICAL_COLUMNS:
+            if col not in self._dtypes or col == 'Join_Month_Year':
+                continue
+            new = {r[col] for r in records if col in r and r[col] is not None} - set(self._dtypes[col].categories)
+            if new:
+                self._add_categories(col, new)
+
+    def _month_labels(self, months):
+        labels = np.asarray(month_label(months)).astype(str)
+        new = set(labels) - set(self._dtypes['Join_Month_Year'].categories)
+        if new:
+            self._add_categories('Join_Month_Year', new)
+        return labels
+
+    def _buffer_values(self, col, values):
+        """
+        `values` as the buffer of `col` holds them (codes for a categorical).
+        Raises ValueError when the column can't hold one of them.
+        """
+        dtype, buffer_dtype = self._dtypes[col], self._buffers[col].dtype
+        try:
+            if isinstance(dtype, pd.CategoricalDtype):
+                cast = pd.Categorical(values, dtype=dtype)
+                if (cast.isna() & pd.notna(np.asarray(values, dtype=object))).any():
+                    raise ValueError("unknown category")
+                return cast.codes.astype(buffer_dtype)
+            if pd.api.types.is_bool_dtype(dtype):
+                if not all(isinstance(v, (bool, np.bool_)) for v in values):
+                    raise ValueError("not a boolean")
+                return np.asarray(values, dtype=bool)
+            if pd.api.types.is_numeric_dtype(dtype):
+                given = np.asarray(values, dtype=float)
+                cast = given.astype(buffer_dtype)
+                if not np.array_equal(cast, given, equal_nan=True):
+                    raise ValueError(f"out of range for {dtype}")
+                return cast
+            return pd.Series(values, dtype=object).astype(dtype).to_numpy().astype(buffer_dtype)
+        except (TypeError, ValueError) as e:
+            raise ValueError(f"Invalid {col} value in {list(values)!r}") from e
+
+    # --- Public API ---
+
+    def apply_events(self, events):
+        """
+        Applies a batch of hire / exit / transfer / update events. Returns a
+        summary with the new version. Invalid events raise ValueError before
+        anything is changed.
+        """
+        merged = {}
+        hires = []
+        next_id = None
+        for event in events:
+            fields = _event_record(event)
+            if fields.get('Emp_ID') is None:
+                if next_id is None:
+                    sorted_ids = self._sorted_ids()[0]
+                    next_id = int(sorted_ids[-1]) + 1 if len(sorted_ids) else 50000
+                    next_id = max([next_id] + [k + 1 for k in merged])
+                fields['Emp_ID'] = next_id
+                next_id += 1
+            emp_id = _emp_id(fields['Emp_ID'])
+            fields['Emp_ID'] = emp_id
+            if event.get('type') == 'hire':
+                hires.append(emp_id)
+            merged.setdefault(emp_id, {}).update(fields)
+
+        with self._lock:
+            ids = list(merged)
+            positions = self._positions(ids)
+            # Complete and validate everything before the first write
+            updates = [(p, self._complete(merged[i], self.df.iloc[p])) for i, p in zip(ids, positions) if p >= 0]
+            inserts = []
+            for i, p in zip(ids, positions):
+                if p >= 0:
+                    continue
+                if i not in hires:
+                    raise ValueError(f"Unknown employee FM-{i}")
+                missing = [c for c in HIRE_REQUIRED if c not in merged[i]]
+                if missing:
+                    raise ValueError(f"Hire FM-{i} is missing {', '.join(missing)}")
+                inserts.append(self._complete({'Join_Date': datetime.now().date(), **HIRE_DEFAULTS, **merged[i]}))
+
+            if updates or inserts:
+                self._own(extra=len(inserts))
+                self._ensure_categories([record for _, record in updates] + inserts)
+                # Every value is cast before the first write: one the frame can't
+                # hold fails the batch with nothing written
+                positions, changes = self._update_values(updates) if updates else (None, {})
+                added = self._row_values(inserts) if inserts else None
+                if changes:
+                    self._apply_updates(positions, changes)
+                if added:
+                    self._append(added)
+            self.revision += 1
+            self.df.attrs['version'] = self.version
+        return {'version': self.version, 'updated': len(updates), 'added': len(inserts), 'rows': len(self.df)}
+
+    def _update_values(self, updates):
+        """
+        (row positions, {column: (positions, buffer values)}) for the updates.
+        """
+        positions = np.array([p for p, _ in updates])
+        records = [record for _, record in updates]
+        changes = {}
+        for col in dict.fromkeys(c for r in records for c in r):
+            if col in self._buffers and col != 'Emp_ID':
+                at = [i for i, r in enumerate(records) if col in r]
+                changes[col] = (positions[at], self._buffer_values(col, [records[i][col] for i in at]))
+        moved = [i for i, r in enumerate(records) if 'Join_Month' in r]
+        if moved:
+            labels = self._month_labels([records[i]['Join_Month'] for i in moved])
+            changes['Join_Month_Year'] = (positions[moved], self._buffer_values('Join_Month_Year', labels))
+        return positions, changes
+
+    def _row_values(self, records):
+        """
+        {column: buffer values} for new rows.
+        """
+        values = {}
+        for col in self._buffers:
+            if col == 'Join_Month_Year':
+                column = self._month_labels([r['Join_Month'] for r in records])
+            else:
+                column = [r.get(col) for r in records]
+            values[col] = self._buffer_values(col, column)
+        return values
+
+    def _apply_updates(self, positions, changes):
+        before = self.df.take(positions)
+        for col, (at, values) in changes.items():
+            self._buffers[col][at] = values
+        self._publish(len(self.df))
+        after = self.df.take(positions)
+
+        self.filter_index.update(positions, before, after)
+        self.cube.add(before, -1)
+        self.cube.add(after, 1)
+        self.flows.add(before, -1)
+        self.flows.add(after, 1)
+        self.quantiles.add(before, -1)
+        self.quantiles.add(after, 1)
+
+    def _append(self, values):
+        n = len(self.df)
+        count = len(values['Emp_ID'])
+        for col, column in values.items():
+            self._buffers[col][n:n + count] = column
+        self._publish(n + count)
+        rows = self.df.iloc[n:]
+
+        if self._ids is not None:
+            sorted_ids, order = self._ids
+            new_ids, new_order = rows['Emp_ID'].to_numpy(), np.arange(n, n + count)
+            if len(sorted_ids) and new_ids.min() <= sorted_ids[-1]:
+                self._ids = None  # explicit out-of-order ids: rebuild on the next lookup
+            else:
+                sort = np.argsort(new_ids, kind='stable')
+                self._ids = (np.concatenate([sorted_ids, new_ids[sort]]), np.concatenate([order, new_order[sort]]))
+
+        self.filter_index.append(rows)
+        self.cube.add(rows, 1)
+        self.flows.add(rows, 1)
+        self.quantiles.add(rows, 1)
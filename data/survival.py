@@ -0,0 +1,93 @@
+# data/survival.py
+"""
+Retention (survival) curves over tenure.
+
+Every employee contributes a tenure in whole months: up to the exit month
+for leavers (an event) and up to the current month for everyone still
+employed (censored, i.e. still at risk). Kaplan-Meier estimates the share
+still employed after each month of tenure, so active employees count for as
+long as they have been observed instead of being left out.
+
+All groups are estimated at once from two bincounts over (group, tenure)
+keys, so a curve set costs one pass over the selected rows whatever the
+number of groups.
+"""
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from data.schema import NO_EXIT
+
+# Groupings offered on the Trends page; 'Cohort' is the join year
+SURVIVAL_GROUPS = ['Grade', 'Department', 'Site_Name', 'Cohort']
+# Curves stop where fewer employees than this are still at risk
+MIN_AT_RISK = 20
+
+
+def current_month():
+    today = datetime.now().date()
+    return today.year * 12 + today.month - 1
+
+
+def tenure_months(rows, as_of=None):
+    """
+    (tenure in months, exited) per row. Tenure runs to the exit month for
+    leavers and to `as_of` (a month ordinal, default this month) for the rest.
+    """
+    as_of = current_month() if as_of is None else as_of
+    join = rows['Join_Month'].to_numpy()
+    exit_month = rows['Exit_Month'].to_numpy()
+    exited = (exit_month != NO_EXIT) & (rows['Status'] == 'Resigned').to_numpy()
+    end = np.where(exited, exit_month, np.maximum(as_of, join))
+    # An exit recorded before the join would be a negative duration; count it as month 0
+    return np.maximum(end - join, 0).astype(np.int64), exited
+
+
+def kaplan_meier(tenure, exited, codes, n_groups):
+    """
+    Survival per (group, month of tenure) for integer group `codes` in
+    [0, n_groups). Returns (survival, at_risk), both (n_groups, months) arrays;
+    survival is NaN where nobody is at risk any more.
+    """
+    months = int(tenure.max()) + 1 if len(tenure) else 1
+    keys = codes.astype(np.int64) * months + tenure
+    size = n_groups * months
+    exits = np.bincount(keys[exited], minlength=size).reshape(n_groups, months)
+    observed = np.bincount(keys, minlength=size).reshape(n_groups, months)
+    # At risk at month t: everyone whose tenure reached t
+    at_risk = observed[:, ::-1].cumsum(axis=1)[:, ::-1]
+    hazard = np.divide(exits, at_risk, out=np.zeros(exits.shape), where=at_risk > 0)
+    survival = np.cumprod(1 - hazard, axis=1)
+    survival[at_risk == 0] = np.nan
+    return survival, at_risk
+
+
+def survival_curves(rows, by, as_of=None, top=None, min_at_risk=MIN_AT_RISK):
+    """
+    Long frame (Group, Tenure_Months, Survival, At_Risk) of Kaplan-Meier
+    curves for each value of `by` (a column of `rows`, or 'Cohort' for the
+    join year). `top` keeps the groups with the most employees.
+    """
+    tenure, exited = tenure_months(rows, as_of)
+    if by == 'Cohort':
+        years = rows['Join_Month'].to_numpy() // 12
+        first = int(years.min()) if len(years) else 0
+        codes = years - first
+        groups = [str(year) for year in range(first, first + (int(codes.max()) + 1 if len(codes) else 0))]
+    else:
+        values = rows[by].cat
+        codes, groups = values.codes.to_numpy(), list(values.categories)
+    survival, at_risk = kaplan_meier(tenure, exited, codes, len(groups))
+
+    keep = np.flatnonzero(at_risk[:, 0] > 0)
+    if top is not None:
+        keep = keep[np.argsort(-at_risk[keep, 0], kind='stable')[:top]]
+    group, month = np.nonzero(at_risk[keep] >= min_at_risk)
+    group = keep[group]
+    return pd.DataFrame({
+        'Group': np.asarray(groups, dtype=object)[group],
+        'Tenure_Months': month,
+        'Survival': np.round(survival[group, month] * 100, 2),
+        'At_Risk': at_risk[group, month],
+    })
@@ -0,0 +1,58 @@
+# data/view.py
+from functools import cached_property
+from data.survival import survival_curves
+from utils.metrics import span, FILTER_SECONDS
+
+
+class WorkforceView:
+    """
+    The sidebar selection applied to the dataset. The filtered rows, the cube
+    slice, the monthly series and the box stats are only computed if a chart
+    asks for them.
+    """
+    def __init__(self, store, filters, geo=None):
+        self.store = store
+        self.geo = geo
+        self.filters = filters
+        self._survival = {}
+        self._box_stats = {}
+
+    @cached_property
+    def rows(self):
+        with span(FILTER_SECONDS, step='rows'):
+            return self.store.filter_index.select(self.store.df, self.filters)
+
+    @cached_property
+    def cells(self):
+        with span(FILTER_SECONDS, step='cells'):
+            return self.store.cube.slice(self.filters)
+
+    @cached_property
+    def flows(self):
+        with span(FILTER_SECONDS, step='flows'):
+            return self.store.flows.frame(self.filters)
+
+    @cached_property
+    def timeline(self):
+        with span(FILTER_SECONDS, step='timeline'):
+            return self.store.flows.timeline(self.filters)
+
+    def box_stats(self, column):
+        """
+        Per-grade quartiles, whiskers and outliers of `column` for the
+        selection, from the store's quantile sketch (see data/quantiles.py).
+        """
+        if column not in self._box_stats:
+            with span(FILTER_SECONDS, step='box_stats'):
+                self._box_stats[column] = self.store.quantiles.box_stats(column, self.filters)
+        return self._box_stats[column]
+
+    def survival(self, by, top=None):
+        """
+        Retention curves of the selection grouped by `by` (see data/survival.py).
+        """
+        if (by, top) not in self._survival:
+            rows = self.rows
+            with span(FILTER_SECONDS, step='survival'):
+                self._survival[(by, top)] = survival_curves(rows, by, top=top)
+        return self._survival[(by, top)]
@@ -0,0 +1,33 @@
+# gunicorn.conf.py
+"""
+Gunicorn settings for the Procfile deployment.
+
+The app is imported once, in the master, before the workers are forked.
+index.py loads the dataset in a background thread: it memory-maps the Arrow
+snapshot (building it first if needed) and builds the filter index and cube.
+pre_fork waits for that load, so the forked workers share the data pages, the
+page-cache copy of the snapshot and the imported libraries instead of each
+building and holding its own. Worker count comes from WEB_CONCURRENCY
+(gunicorn's default).
+
+Set OPTICK_PRELOAD=0 to fork right away instead: each worker then answers
+/health as soon as it has imported the app and loads the data itself (the
+snapshot's pages are still shared through the page cache, the indexes are not).
+
+Events posted to /events (OPTICK_INGEST=1) only reach the worker that serves
+the request; run ingestion with a single worker.
+"""
+import gc
+import os
+
+preload_app = os.environ.get("OPTICK_PRELOAD", "1") != "0"
+
+
+def pre_fork(server, worker):
+    if not preload_app:
+        return
+    import index
+    index.dataset.get()
+    # Move everything allocated so far out of the collector's reach: a collection in
+    # a worker would otherwise write to (and so un-share) every object it visits
+    gc.freeze()
@@ -1,26 +1,71 @@
-from dash import html, dcc, Input, Output
-import dash_bootstrap_components as dbc
-import pandas as pd
-import sys
-from app import app
+from utils.startup import startup_timer, BackgroundLoad
+import importlib
+with startup_timer.phase("import dash"):
+    from dash import html, dcc, Input, Output, ctx
+    import dash_bootstrap_components as dbc
+    from flask import jsonify, request
+    from app import app
 server = app.server
-from data.engine import load_data
+with startup_timer.phase("import data modules"):
+    from data.view import WorkforceView
+    from data.geo import register_geo_routes
+    from data.schema import ZONES, GRADES
+from utils.cache import figure_cache, FigureCache
+from utils.plotting import figure_patch
 from components.sidebar import create_sidebar
-from config import BG_COLOR, CARD_BG, TEXT_MAIN, TEXT_SUB, PRIMARY, SIDEBAR_BG
+from utils.clientside import STORE_ID, VERSION_STORE_ID, client_store, register_clientside
+from utils.compression import register_compression
+from utils.metrics import configure_logging, register_metrics, span, timed_callback, LAYOUT_SECONDS
+from config import BG_COLOR, CARD_BG, TEXT_MAIN, TEXT_SUB, PRIMARY, SIDEBAR_BG, INGEST_ENABLED, CLIENTSIDE_FILTERING, COMPRESS_RESPONSES, METRICS_ENABLED, LOG_LEVEL
+
+configure_logging(LOG_LEVEL)
 
 # Import Pages
+for name in ("overview", "sites", "trends", "talent"):
+    with startup_timer.phase(f"import pages.{name}"):
+        importlib.import_module(f"pages.{name}")
 from pages import overview, sites, trends, talent
 
-# 1. Load Data
-df, geojson_data = load_data()
-unique_zones = df['Zone'].unique()
-unique_grades = df['Grade'].unique()
+# 1. Load Data (in the background: the server answers and serves the shell meanwhile)
+def load_state():
+    with startup_timer.phase("import data.engine"):
+        from data.engine import load_data
+        from data.store import WorkforceStore
+    with startup_timer.phase("load data"):
+        df, _ = load_data()
+    # Base frame + filter index, cube, monthly flows and quantile sketch, kept current by ingested events
+    with startup_timer.phase("build indexes"):
+        store = WorkforceStore(df)
+    figure_cache.set_version(store.version)
+    view_cache.set_version(store.version)
+    startup_timer.mark_ready()
+    startup_timer.print_report()
+    return store
+
+def fallback_geojson():
+    from data.engine import load_geojson
+    return load_geojson()
+
+# Filtered views shared by all the chart callbacks fired by one filter change
+view_cache = FigureCache(maxsize=8)
+dataset = BackgroundLoad(load_state)
+# The map geometry levels are served once as cacheable assets; figures only reference their URLs
+with startup_timer.phase("register map geometry"):
+    geo = register_geo_routes(app, fallback_geojson)
+# Callback JSON, geometry and the JS bundles go out gzip/brotli-compressed
+if COMPRESS_RESPONSES:
+    register_compression(server)
+# Per-callback timing histograms on /metrics and a log line per callback (sizes measured before compression)
+if METRICS_ENABLED:
+    register_metrics(server)
 
 # 2. Main Layout Shell
 app.layout = html.Div([
     dcc.Location(id="url"), 
-    create_sidebar(unique_zones, unique_grades), 
-    html.Div(id="page-content", className="content")
+    create_sidebar(ZONES, GRADES), 
+    html.Div(id="page-content", className="content"),
+    # Pre-aggregated counts for the clientside callbacks (clientside mode only)
+    *([dcc.Store(id=STORE_ID), dcc.Store(id=VERSION_STORE_ID)] if CLIENTSIDE_FILTERING else []),
 ])
 
 # 3. Add Custom CSS (Inline for simplicity, or move to assets/style.css)
@@ -54,30 +99,97 @@ app.index_string = f'''
 </html>
 '''
 
-# 4. Global Callback
-@app.callback(
-    Output("page-content", "children"),
-    [Input("url", "pathname"), Input("zone-filter", "value"), Input("grade-filter", "value")]
-)
-def display_page(pathname, sel_zones, sel_grades):
-    print(f"DEBUG: Pathname received: {pathname}", file=sys.stderr)
-    sys.stderr.flush()
-    # Filter Data Global Logic
-    dff = df.copy()
-    if sel_zones: dff = dff[dff['Zone'].isin(sel_zones)]
-    if sel_grades: dff = dff[dff['Grade'].isin(sel_grades)]
-
-    if pathname == "/" or pathname is None:
-        return overview.render_overview(dff)
-    elif pathname == "/sites":
-        # Note: You'd pass geojson_data here if you implement it in site_plots
-        return sites.render_sites(dff, geojson_data) 
-    elif pathname == "/trends":
-        return trends.render_trends(dff)
-    elif pathname == "/talent":
-        return talent.render_talent(dff)
-    else:
+# 4. Callbacks
+PAGES = {"/": overview, "/sites": sites, "/trends": trends, "/talent": talent}
+
+# Navigation only swaps the static page skeleton
+@app.callback(Output("page-content", "children"), Input("url", "pathname"))
+@timed_callback
+def display_page(pathname):
+    page = PAGES.get(pathname or "/")
+    if page is None:
         return html.Div("404 Page Not Found")
+    with span(LAYOUT_SECONDS, page=pathname or "/"):
+        return page.layout()
+
+def get_view(sel_zones, sel_grades):
+    # Callbacks fired while the data is still loading wait for it
+    store = dataset.get()
+    key = view_cache.key("view", sel_zones, sel_grades)
+    filters = {'Zone': sel_zones, 'Grade': sel_grades}
+    return view_cache.get_or_build(key, lambda: WorkforceView(store, filters, geo))
+
+# Every KPI value, figure and table on a page updates through its own callback
+def register_output(component_id, prop, build):
+    @app.callback(Output(component_id, prop), [Input("zone-filter", "value"), Input("grade-filter", "value")])
+    @timed_callback
+    def update_output(sel_zones, sel_grades):
+        # Wait for the data first, so the first render is cached under the loaded version
+        dataset.get()
+        # Identical (output, filters) selections are served from the figure cache
+        key = figure_cache.key(f"{component_id}.{prop}", sel_zones, sel_grades)
+        value = figure_cache.get_or_build(key, lambda: build(get_view(sel_zones, sel_grades)))
+        # Triggered by a filter change: the figure is already on screen, so only ship its new trace data
+        if prop == "figure" and ctx.triggered_id is not None:
+            return figure_patch(value)
+        return value
+    return update_output
+
+# Clientside mode: the count charts and KPIs are redrawn in the browser from one store
+client_outputs = {}
+if CLIENTSIDE_FILTERING:
+    client_outputs = {key: (page.OUTPUTS[key], function)
+                      for page in PAGES.values() for key, function in getattr(page, "CLIENT_OUTPUTS", {}).items()}
+
+    def build_client_store():
+        store = dataset.get()
+        key = figure_cache.key(STORE_ID)
+        return figure_cache.get_or_build(key, lambda: client_store(WorkforceView(store, {}, geo), client_outputs, store.version))
+
+    register_clientside(app, client_outputs, build_client_store, lambda: dataset.get().version)
+
+for page in PAGES.values():
+    for (component_id, prop), build in page.OUTPUTS.items():
+        if (component_id, prop) not in client_outputs:
+            register_output(component_id, prop, build)
+talent.register_callbacks(app, get_view)
+trends.register_callbacks(app, get_view)
+sites.register_callbacks(app, geo)
+
+# 5. Cache sizing and health
+@server.route("/cache-stats")
+def cache_stats():
+    return jsonify(figure_cache.stats())
+
+# Answers as soon as the server is up; `data` tells whether the dataset has loaded
+@server.route("/health")
+def health():
+    return jsonify({'status': 'ok', 'data': dataset.state, 'startup': startup_timer.report()})
+
+# 503 until the dataset has loaded, for load balancers that should hold traffic until then
+@server.route("/ready")
+def ready():
+    state = dataset.state
+    return jsonify({'data': state}), 200 if state == 'ready' else 503
+
+# 6. Event ingestion: hires / exits / transfers update the live state incrementally
+def ingest_events():
+    events = request.get_json(silent=True)
+    if isinstance(events, dict):
+        events = [events]
+    if not isinstance(events, list):
+        return jsonify({'error': 'Expected a JSON event or list of events'}), 400
+    store = dataset.get()
+    try:
+        result = store.apply_events(events)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    figure_cache.set_version(store.version)
+    view_cache.set_version(store.version)
+    return jsonify(result)
+
+if INGEST_ENABLED:
+    server.add_url_rule("/events", "ingest_events", ingest_events, methods=["POST"])
 
 if __name__ == "__main__":
     app.run(debug=True, port=8000)
\ No newline at end of file
@@ -3,29 +3,73 @@ import dash_bootstrap_components as dbc
 from components.kpi_card import kpi_widget
 from plots.overview_plots import plot_role_distribution, plot_gender_split, plot_experience_hist, plot_software_adoption
 from config import PRIMARY, SECONDARY, DANGER, SUCCESS
+from data.cube import total
+from utils.render import render_outputs
 
-def render_overview(dff):
-    # Logic
-    total_hc = len(dff[dff['Status']=='Active'])
-    avg_exp = round(dff['Total_Experience'].mean(), 1) if len(dff) > 0 else 0
-    attrition = round((len(dff[dff['Status']=='Resigned']) / len(dff)) * 100, 1) if len(dff) > 0 else 0
-    sw_adoption = round((len(dff[dff['Software_User']=='Yes']) / len(dff)) * 100, 0) if len(dff) > 0 else 0
-
+def layout():
+    # Static skeleton: KPI values and figures are filled in by their own callbacks (see OUTPUTS)
     return html.Div([
         html.H2("Executive Dashboard", className="h-title"),
         dbc.Row([
-            kpi_widget("Total Headcount", f"{total_hc:,}", "👥", PRIMARY),
-            kpi_widget("Avg Experience", f"{avg_exp} Yrs", "🎓", SECONDARY),
-            kpi_widget("Attrition Rate", f"{attrition}%", "📉", DANGER),
-            kpi_widget("Digital Adoption", f"{sw_adoption}%", "💻", SUCCESS),
+            kpi_widget("Total Headcount", "", "👥", PRIMARY, value_id="overview-kpi-headcount"),
+            kpi_widget("Avg Experience", "", "🎓", SECONDARY, value_id="overview-kpi-experience"),
+            kpi_widget("Attrition Rate", "", "📉", DANGER, value_id="overview-kpi-attrition"),
+            kpi_widget("Digital Adoption", "", "💻", SUCCESS, value_id="overview-kpi-adoption"),
         ], className="mb-4"),
-        
+
         dbc.Row([
-            dbc.Col(html.Div([html.H5("Workforce by Role", className="mb-3"), dcc.Graph(figure=plot_role_distribution(dff))], className="custom-card"), width=8),
-            dbc.Col(html.Div([html.H5("Gender Split", className="mb-3"), dcc.Graph(figure=plot_gender_split(dff, total_hc))], className="custom-card"), width=4)
+            dbc.Col(html.Div([html.H5("Workforce by Role", className="mb-3"), dcc.Graph(id="overview-role-graph")], className="custom-card"), width=8),
+            dbc.Col(html.Div([html.H5("Gender Split", className="mb-3"), dcc.Graph(id="overview-gender-graph")], className="custom-card"), width=4)
         ]),
         dbc.Row([
-            dbc.Col(html.Div([html.H5("Experience Distribution", className="mb-3"), dcc.Graph(figure=plot_experience_hist(dff))], className="custom-card"), width=6),
-            dbc.Col(html.Div([html.H5("Tool Adoption by Role", className="mb-3"), dcc.Graph(figure=plot_software_adoption(dff))], className="custom-card"), width=6)
+            dbc.Col(html.Div([html.H5("Experience Distribution", className="mb-3"), dcc.Graph(id="overview-experience-graph")], className="custom-card"), width=6),
+            dbc.Col(html.Div([html.H5("Tool Adoption by Role", className="mb-3"), dcc.Graph(id="overview-adoption-graph")], className="custom-card"), width=6)
         ])
-    ])
\ No newline at end of file
+    ])
+
+# KPI logic (each KPI comes from the cube slice)
+def kpi_headcount(cells):
+    return f"{total(cells, Status='Active'):,}"
+
+def kpi_experience(cells):
+    total_all = total(cells)
+    avg_exp = round(cells['Experience_Sum'].sum() / total_all, 1) if total_all > 0 else 0
+    return f"{avg_exp} Yrs"
+
+def kpi_attrition(cells):
+    total_all = total(cells)
+    attrition = round((total(cells, Status='Resigned') / total_all) * 100, 1) if total_all > 0 else 0
+    return f"{attrition}%"
+
+def kpi_adoption(cells):
+    total_all = total(cells)
+    sw_adoption = round((total(cells, Software_User='Yes') / total_all) * 100, 0) if total_all > 0 else 0
+    return f"{sw_adoption}%"
+
+# (component id, property) -> builder(view)
+OUTPUTS = {
+    ("overview-kpi-headcount", "children"): lambda view: kpi_headcount(view.cells),
+    ("overview-kpi-experience", "children"): lambda view: kpi_experience(view.cells),
+    ("overview-kpi-attrition", "children"): lambda view: kpi_attrition(view.cells),
+    ("overview-kpi-adoption", "children"): lambda view: kpi_adoption(view.cells),
+    ("overview-role-graph", "figure"): lambda view: plot_role_distribution(view.cells),
+    ("overview-gender-graph", "figure"): lambda view: plot_gender_split(view.cells, total(view.cells, Status='Active')),
+    ("overview-experience-graph", "figure"): lambda view: plot_experience_hist(view.rows),
+    ("overview-adoption-graph", "figure"): lambda view: plot_software_adoption(view.cells),
+}
+
+# Outputs the browser can redraw from the pre-aggregated counts (clientside mode):
+# (component id, property) -> function in assets/clientside.js
+CLIENT_OUTPUTS = {
+    ("overview-kpi-headcount", "children"): "kpi_headcount",
+    ("overview-kpi-experience", "children"): "kpi_experience",
+    ("overview-kpi-attrition", "children"): "kpi_attrition",
+    ("overview-kpi-adoption", "children"): "kpi_adoption",
+    ("overview-role-graph", "figure"): "role_distribution",
+    ("overview-gender-graph", "figure"): "gender_split",
+    ("overview-adoption-graph", "figure"): "software_adoption",
+}
+
+def render_overview(view):
+    # Every dynamic value on the page for one filter selection, built concurrently
+    return render_outputs(view, OUTPUTS, inputs=('rows', 'cells'))
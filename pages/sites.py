@@ -1,10 +1,13 @@
 # pages/sites.py
-from dash import html, dcc
+from dash import html, dcc, Input, Output, Patch, no_update
 import dash_bootstrap_components as dbc
 from plots.site_plots import plot_geo_map, plot_top_sites_horizontal,  plot_critical_sites
 from config import TEXT_SUB
+from utils.metrics import timed_callback
+from utils.render import render_outputs
 
-def render_sites(dff, geojson_data):
+def layout():
+    # Static skeleton: figures are filled in by their own callbacks (see OUTPUTS)
     return html.Div([
         html.H2("Site Intelligence", className="h-title"),
         
@@ -15,13 +18,13 @@ def render_sites(dff, geojson_data):
             dbc.Row([
                 # Left Side: MAP
                 dbc.Col(dcc.Graph(
-                    figure=plot_geo_map(dff, geojson_data), 
+                    id="sites-map-graph",
                     style={'height': '450px', 'borderRadius': '8px', 'overflow': 'hidden'}
                 ), width=7, style={'paddingRight': '0'}),
                 
                 # Right Side: HORIZONTAL BARS
                 dbc.Col(html.Div([
-                    dcc.Graph(figure=plot_top_sites_horizontal(dff), style={'height': '450px'})
+                    dcc.Graph(id="sites-top-graph", style={'height': '450px'})
                 ], style={'borderLeft': '1px solid #E2E8F0', 'paddingLeft': '15px'}), width=5)
             ])
         ], className="custom-card"),
@@ -38,7 +41,45 @@ def render_sites(dff, geojson_data):
         dbc.Row([
             dbc.Col(html.Div([
                 html.H5("Top Critical Sites (High Profile)", className="mb-3"), 
-                dcc.Graph(figure=plot_critical_sites(dff))
+                dcc.Graph(id="sites-critical-graph")
             ], className="custom-card"), width=12)
         ])
-    ])
\ No newline at end of file
+    ])
+
+def build_map(view):
+    # Fit the map to the selected zones and reference the lightest geometry level for that zoom
+    if view.geo is None:
+        return plot_geo_map(view.cells)
+    states = view.cells['State'].astype(str).unique().tolist() if view.filters.get('Zone') else None
+    center, zoom = view.geo.viewport(states)
+    return plot_geo_map(view.cells, view.geo.url_for_zoom(zoom), center=center, zoom=zoom)
+
+# (component id, property) -> builder(view). Site Intel is counts-only, so it never touches the raw rows.
+OUTPUTS = {
+    ("sites-map-graph", "figure"): build_map,
+    ("sites-top-graph", "figure"): lambda view: plot_top_sites_horizontal(view.cells),
+    ("sites-critical-graph", "figure"): lambda view: plot_critical_sites(view.cells),
+}
+
+def render_sites(view):
+    # Every dynamic value on the page for one filter selection, built concurrently
+    return render_outputs(view, OUTPUTS, inputs=('cells',))
+
+def register_callbacks(app, geo):
+    # Swap in a finer (or lighter) geometry level when the user zooms past a level's range
+    if geo is None or len(geo.levels) < 2:
+        return
+
+    @app.callback(
+        Output("sites-map-graph", "figure", allow_duplicate=True),
+        Input("sites-map-graph", "relayoutData"),
+        prevent_initial_call=True
+    )
+    @timed_callback
+    def update_map_detail(relayout):
+        zoom = (relayout or {}).get("mapbox.zoom")
+        if zoom is None:
+            return no_update
+        patched = Patch()
+        patched['data'][0]['geojson'] = geo.url_for_zoom(zoom)
+        return patched
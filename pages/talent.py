@@ -1,35 +1,75 @@
-from dash import html, dcc, dash_table
+from dash import html, dcc, dash_table, Input, Output
 import dash_bootstrap_components as dbc
 from config import TEXT_MAIN
 from plots.talent_plots import plot_top_skills, plot_exp_by_grade
+from data.schema import format_emp_id
+from data.query import page_of
+from utils.metrics import timed_callback
+from utils.render import render_outputs
 
-def render_talent(dff):
-    # Columns to show in the table
-    table_cols = ['Emp_ID', 'Name', 'Role', 'Grade', 'Shift', 'Compliance_Score', 'City']
-    
+# Columns to show in the table
+TABLE_COLS = ['Emp_ID', 'Name', 'Role', 'Grade', 'Shift', 'Compliance_Score', 'City']
+
+def layout():
+    # Static skeleton: figures are filled in by their own callbacks (see OUTPUTS),
+    # roster pages by update_roster
     return html.Div([
         html.H2("Workforce Analytics", className="h-title"),
         dbc.Row([
             dbc.Col(html.Div([
                 html.H5("Top Skills Inventory", className="mb-3"), 
-                dcc.Graph(figure=plot_top_skills(dff))
+                dcc.Graph(id="talent-skills-graph")
             ], className="custom-card"), width=6),
             dbc.Col(html.Div([
                 html.H5("Experience Ranges by Grade", className="mb-3"), 
-                dcc.Graph(figure=plot_exp_by_grade(dff))
+                dcc.Graph(id="talent-experience-graph")
             ], className="custom-card"), width=6)
         ]),
         html.H3("Detailed Roster", className="h-title mt-4"),
         html.Div([
             dash_table.DataTable(
-                data=dff.to_dict('records'),
-                columns=[{'name': i.replace('_', ' '), 'id': i} for i in table_cols],
+                id="talent-roster-table",
+                columns=[{'name': i.replace('_', ' '), 'id': i, 'type': 'numeric' if i == 'Compliance_Score' else 'text'} for i in TABLE_COLS],
+                # Paging, sorting and filtering run on the server: only the visible page is sent
+                page_current=0,
                 page_size=10,
-                sort_action='native',
-                filter_action='native',
+                page_action='custom',
+                sort_action='custom',
+                sort_mode='multi',
+                sort_by=[],
+                filter_action='custom',
+                filter_query='',
                 style_header={'backgroundColor': '#F8FAFC', 'fontWeight': 'bold', 'borderBottom': '2px solid #E2E8F0', 'color': TEXT_MAIN},
                 style_cell={'textAlign': 'left', 'padding': '12px', 'fontFamily': 'Inter', 'borderBottom': '1px solid #E2E8F0', 'color': TEXT_MAIN},
                 style_data_conditional=[{'if': {'row_index': 'odd'}, 'backgroundColor': '#F8FAFC'}]
             )
         ], className="custom-card")
-    ])
\ No newline at end of file
+    ])
+
+def roster_page(dff, page_current, page_size, sort_by, filter_query):
+    page, page_count = page_of(dff, filter_query, sort_by, page_current, page_size, TABLE_COLS)
+    roster = page.astype({c: str for c in ['Name', 'Role', 'Grade', 'Shift', 'City']})
+    roster['Emp_ID'] = format_emp_id(roster['Emp_ID']).to_numpy()
+    return roster.to_dict('records'), page_count
+
+def register_callbacks(app, get_view):
+    @app.callback(
+        [Output("talent-roster-table", "data"), Output("talent-roster-table", "page_count")],
+        [Input("zone-filter", "value"), Input("grade-filter", "value"),
+         Input("talent-roster-table", "page_current"), Input("talent-roster-table", "page_size"),
+         Input("talent-roster-table", "sort_by"), Input("talent-roster-table", "filter_query")]
+    )
+    @timed_callback
+    def update_roster(sel_zones, sel_grades, page_current, page_size, sort_by, filter_query):
+        return roster_page(get_view(sel_zones, sel_grades).rows, page_current, page_size, sort_by, filter_query)
+
+# (component id, property) -> builder(view)
+OUTPUTS = {
+    ("talent-skills-graph", "figure"): lambda view: plot_top_skills(view.cells),
+    ("talent-experience-graph", "figure"): lambda view: plot_exp_by_grade(view.box_stats('Total_Experience')),
+}
+
+def render_talent(view):
+    # Every dynamic value on the page for one filter selection (first roster page included), built concurrently
+    outputs = {**OUTPUTS, ("talent-roster-table", "data"): lambda view: roster_page(view.rows, 0, 10, [], '')[0]}
+    return render_outputs(view, outputs, inputs=('rows', 'cells'))
@@ -1,15 +1,26 @@
 # pages/trends.py
-from dash import html, dcc
+from dash import html, dcc, Input, Output, ctx
 import dash_bootstrap_components as dbc
 from plots.trend_plots import (
     plot_hiring_trend, 
+    plot_headcount_trend,
+    plot_rolling_attrition,
     plot_attrition_by_grade, 
     plot_attrition_by_dept, 
-    plot_tenure_risk,
-    plot_top_exit_sites  # <-- New Import
+    plot_top_exit_sites,  # <-- New Import
+    plot_survival
 )
+from utils.cache import figure_cache
+from utils.plotting import figure_patch
+from utils.metrics import timed_callback
+from utils.render import render_outputs
 
-def render_trends(dff):
+# Retention curve groupings: label -> (column, how many groups to show)
+SURVIVAL_OPTIONS = {'Grade': ('Grade', None), 'Department': ('Department', None), 'Top Sites': ('Site_Name', 8)}
+COHORT_COLORS = ['#BFDBFE', '#93C5FD', '#60A5FA', '#3B82F6', '#2563EB', '#1D4ED8', '#1E3A8A']
+
+def layout():
+    # Static skeleton: figures are filled in by their own callbacks (see OUTPUTS)
     return html.Div([
         html.H2("Growth & Attrition Trends", className="h-title"),
         
@@ -17,20 +28,35 @@ def render_trends(dff):
         dbc.Row([
             dbc.Col(html.Div([
                 html.H5("Monthly Hiring vs. Exits", className="mb-3"), 
-                dcc.Graph(figure=plot_hiring_trend(dff))
+                dcc.Graph(id="trends-hiring-graph")
             ], className="custom-card"), width=12)
         ]),
 
-        # ROW 2: Dept, Grade, and Top Exit Sites
+        # ROW 2: Headcount and rolling attrition
+        dbc.Row([
+            dbc.Col(html.Div([
+                html.H5("Active Headcount & Net Growth", className="mb-3"),
+                dcc.Graph(id="trends-headcount-graph")
+            ], className="custom-card"), width=6),
+
+            dbc.Col(html.Div([
+                html.H5("Rolling 12-Month Attrition", className="mb-3"),
+                html.P("Exits in the trailing 12 months over the average headcount in that period.",
+                       style={'fontSize': '0.75rem', 'color': '#64748B', 'marginBottom': '10px'}),
+                dcc.Graph(id="trends-attrition-rate-graph")
+            ], className="custom-card"), width=6),
+        ]),
+
+        # ROW 3: Dept, Grade, and Top Exit Sites
         dbc.Row([
             dbc.Col(html.Div([
                 html.H5("Attrition by Department", className="mb-3"), 
-                dcc.Graph(figure=plot_attrition_by_dept(dff))
+                dcc.Graph(id="trends-dept-graph")
             ], className="custom-card"), width=4),
             
             dbc.Col(html.Div([
                 html.H5("Attrition by Grade", className="mb-3"), 
-                dcc.Graph(figure=plot_attrition_by_grade(dff))
+                dcc.Graph(id="trends-grade-graph")
             ], className="custom-card"), width=4),
 
             # REPLACED COMPONENT HERE
@@ -38,17 +64,67 @@ def render_trends(dff):
                 html.H5("Sites with Highest Attrition", className="mb-3"), 
                 html.P("Top 5 sites with the most resignations.", 
                        style={'fontSize': '0.75rem', 'color': '#64748B', 'marginBottom': '10px'}),
-                dcc.Graph(figure=plot_top_exit_sites(dff))
+                dcc.Graph(id="trends-exit-sites-graph")
             ], className="custom-card"), width=4),
         ]),
 
-        # ROW 3: Tenure
+        # ROW 4: Tenure risk (retention curves, active employees count while they are still at risk)
         dbc.Row([
             dbc.Col(html.Div([
-                html.H5("Tenure Risk Analysis (When do they resign?)", className="mb-3"), 
-                html.P("Clusters on the left indicate 'Early Churn' issues (bad hiring/onboarding).", 
+                html.H5("Tenure Risk Analysis (When do they resign?)", className="mb-3"),
+                html.P("Share still employed after each month of tenure. A steep early drop indicates 'Early Churn' issues (bad hiring/onboarding).",
                        style={'fontSize': '0.8rem', 'color': '#64748B'}),
-                dcc.Graph(figure=plot_tenure_risk(dff))
-            ], className="custom-card"), width=12)
+                dcc.RadioItems(
+                    id="trends-survival-group", options=list(SURVIVAL_OPTIONS), value='Grade', inline=True,
+                    inputStyle={'marginRight': '6px', 'marginLeft': '14px'}, style={'fontSize': '0.8rem'}
+                ),
+                dcc.Graph(id="trends-survival-graph")
+            ], className="custom-card"), width=7),
+
+            dbc.Col(html.Div([
+                html.H5("Retention by Hiring Cohort", className="mb-3"),
+                html.P("Employees grouped by the year they joined.",
+                       style={'fontSize': '0.8rem', 'color': '#64748B'}),
+                dcc.Graph(id="trends-cohort-graph")
+            ], className="custom-card"), width=5)
         ])
-    ])
\ No newline at end of file
+    ])
+
+# (component id, property) -> builder(view)
+OUTPUTS = {
+    ("trends-hiring-graph", "figure"): lambda view: plot_hiring_trend(view.flows),
+    ("trends-headcount-graph", "figure"): lambda view: plot_headcount_trend(view.timeline),
+    ("trends-attrition-rate-graph", "figure"): lambda view: plot_rolling_attrition(view.timeline),
+    ("trends-dept-graph", "figure"): lambda view: plot_attrition_by_dept(view.cells),
+    ("trends-grade-graph", "figure"): lambda view: plot_attrition_by_grade(view.cells),
+    ("trends-exit-sites-graph", "figure"): lambda view: plot_top_exit_sites(view.cells),
+    ("trends-cohort-graph", "figure"): lambda view: plot_survival(view.survival('Cohort'), COHORT_COLORS),
+}
+
+# Outputs the browser can redraw from the pre-aggregated counts (clientside mode):
+# (component id, property) -> function in assets/clientside.js
+CLIENT_OUTPUTS = {
+    ("trends-hiring-graph", "figure"): "hiring_trend",
+    ("trends-headcount-graph", "figure"): "headcount_trend",
+    ("trends-attrition-rate-graph", "figure"): "rolling_attrition",
+    ("trends-dept-graph", "figure"): "attrition_by_dept",
+    ("trends-grade-graph", "figure"): "attrition_by_grade",
+    ("trends-exit-sites-graph", "figure"): "top_exit_sites",
+}
+
+def register_callbacks(app, get_view):
+    @app.callback(
+        Output("trends-survival-graph", "figure"),
+        [Input("zone-filter", "value"), Input("grade-filter", "value"), Input("trends-survival-group", "value")]
+    )
+    @timed_callback
+    def update_survival(sel_zones, sel_grades, group):
+        column, top = SURVIVAL_OPTIONS.get(group, SURVIVAL_OPTIONS['Grade'])
+        key = figure_cache.key(f"trends-survival-graph.{column}", sel_zones, sel_grades)
+        fig = figure_cache.get_or_build(key, lambda: plot_survival(get_view(sel_zones, sel_grades).survival(column, top)))
+        return figure_patch(fig) if ctx.triggered_id is not None else fig
+
+def render_trends(view):
+    # Every dynamic value on the page for one filter selection, built concurrently
+    outputs = {**OUTPUTS, ("trends-survival-graph", "figure"): lambda view: plot_survival(view.survival('Grade'))}
+    return render_outputs(view, outputs, inputs=('rows', 'cells', 'flows', 'timeline'))
@@ -1,8 +1,12 @@
 import plotly.express as px
 import plotly.graph_objects as go
 import pandas as pd
+import numpy as np
 from config import PRIMARY, SECONDARY, ACCENT, SUCCESS, TEXT_MAIN
 from utils.plotting import clean_layout
+from utils.guards import guard_inputs
+from utils.metrics import timed_plot
+from data.cube import value_counts
 
 # --- 1. CONFIGURATION ---
 
@@ -47,32 +51,43 @@ def hex_to_rgba(hex_code, opacity):
 
 # --- 2. THE CONNECTED MAP & BARS ---
 
-def plot_geo_map(df, geojson_data=None):
+@guard_inputs
+@timed_plot
+def plot_geo_map(cells, geojson_data=None, center=None, zoom=3.2):
     """
     Choropleth Map: Highlights the REGION (State).
+    geojson_data can be the parsed GeoJSON or a URL serving it (see data/geo.py).
     """
     # Aggregate by State
-    state_counts = df.groupby('State')['Emp_ID'].count().reset_index(name='Count')
+    state_counts = cells.groupby('State', observed=True)['Count'].sum().reset_index()
+    state_counts = state_counts[state_counts['Count'] > 0]
     
     # Assign Colors explicitly
-    state_counts['Color'] = state_counts['State'].map(STATE_COLOR_MAP).fillna(DEFAULT_COLOR)
+    state_counts['Color'] = state_counts['State'].astype(str).map(STATE_COLOR_MAP).fillna(DEFAULT_COLOR)
 
     # --- FIX IS HERE: Explicit check 'is not None' ---
     if geojson_data is not None:
-        fig = px.choropleth_mapbox(
-            state_counts,
+        # One trace for all states: z is each state's position in `colors`, and the
+        # stepped colorscale maps it back to the state color. Keeping a single trace
+        # lets filter updates patch locations/z without resending the geometry.
+        colors = state_counts['Color'].tolist() or [DEFAULT_COLOR]
+        steps = max(len(colors) - 1, 1)
+        fig = go.Figure(go.Choroplethmapbox(
             geojson=geojson_data,
-            locations='State',
+            locations=state_counts['State'].astype(str),
             featureidkey="properties.NAME_1",
-            color='State',
-            color_discrete_map=STATE_COLOR_MAP,
-            hover_name='State',
-            hover_data={'State': False, 'Count': True},
-            zoom=3.2,
-            center={"lat": 22, "lon": 82},
-            opacity=0.7
+            z=np.arange(len(state_counts), dtype=np.int8),
+            zmin=0, zmax=steps,
+            colorscale=[[i / steps, c] for i, c in enumerate(colors)] if len(colors) > 1 else [[0, colors[0]], [1, colors[0]]],
+            showscale=False,
+            customdata=state_counts['Count'],
+            hovertemplate="<b>%{location}</b><br><br>Count=%{customdata}<extra></extra>",
+            marker_opacity=0.7
+        ))
+        fig.update_layout(
+            mapbox_style="carto-positron", mapbox_zoom=zoom, mapbox_center=center or {"lat": 22, "lon": 82},
+            margin={'r':0,'t':0,'l':0,'b':0}, showlegend=False
         )
-        fig.update_layout(mapbox_style="carto-positron", margin={'r':0,'t':0,'l':0,'b':0}, showlegend=False)
     else:
         # Fallback if GeoJSON fails
         fig = px.scatter_geo(state_counts, locations='State', locationmode="country names", size='Count')
@@ -80,12 +95,15 @@ def plot_geo_map(df, geojson_data=None):
 
     return fig
 
-def plot_top_sites_horizontal(df):
+@guard_inputs
+@timed_plot
+def plot_top_sites_horizontal(cells):
     """
     Horizontal Bars colored by City (matches State color).
     """
     # Group by Site & City
-    site_counts = df.groupby(['Site_Name', 'City'])['Emp_ID'].count().reset_index(name='Count')
+    site_counts = cells.groupby(['Site_Name', 'City'], observed=True)['Count'].sum().reset_index()
+    site_counts = site_counts[site_counts['Count'] > 0]
     site_counts = site_counts.sort_values('Count', ascending=False).head(10) 
     site_counts = site_counts.sort_values('Count', ascending=True)
 
@@ -112,11 +130,13 @@ def plot_top_sites_horizontal(df):
 
 # --- 3. THE SANKEY DIAGRAM (HIERARCHY) ---
 
+@guard_inputs
+@timed_plot
 def plot_org_treemap(df):
     """
     Sankey Diagram for Zone > Site Flow
     """
-    df_grouped = df.groupby(['Zone', 'Site_Name'])['Emp_ID'].count().reset_index(name='Count')
+    df_grouped = df.groupby(['Zone', 'Site_Name'], observed=True)['Emp_ID'].count().reset_index(name='Count')
     
     zones = list(df_grouped['Zone'].unique())
     sites = list(df_grouped['Site_Name'].unique())
@@ -152,11 +172,13 @@ def plot_org_treemap(df):
 
 # --- 4. CRITICAL SITES ---
 
-def plot_critical_sites(df):
+@guard_inputs
+@timed_plot
+def plot_critical_sites(cells):
     """
     Simple Bar Chart for Critical Sites
     """
-    hp_sites = df[df['Is_High_Profile'] == True]['Site_Name'].value_counts().nlargest(5).reset_index()
+    hp_sites = value_counts(cells[cells['Is_High_Profile'] == True], 'Site_Name').nlargest(5).reset_index()
     hp_sites.columns = ['Site', 'Count']
     fig = px.bar(hp_sites, x='Count', y='Site', orientation='h', text='Count')
     fig.update_traces(marker_color=ACCENT)
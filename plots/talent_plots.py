@@ -1,17 +1,36 @@
 import plotly.express as px
+import plotly.graph_objects as go
 from utils.plotting import clean_layout
+from utils.guards import guard_inputs
+from utils.metrics import timed_plot
+from data.cube import value_counts
 
-def plot_top_skills(df):
+@guard_inputs
+@timed_plot
+def plot_top_skills(cells):
     # 'Primary_Skill' is the column name in our FM data
-    skill_counts = df['Primary_Skill'].value_counts().nlargest(8).reset_index()
+    skill_counts = value_counts(cells, 'Primary_Skill').nlargest(8).reset_index()
     skill_counts.columns = ['Skill', 'Count']
     fig = px.bar(skill_counts, x='Count', y='Skill', orientation='h', text='Count', 
                  color='Count', color_continuous_scale='Teal')
     fig.update_layout(coloraxis_showscale=False)
     return clean_layout(fig)
 
-def plot_exp_by_grade(df):
-    fig = px.box(df, x='Grade', y='Total_Experience', color='Grade', 
-                 color_discrete_sequence=px.colors.qualitative.Prism)
-    fig.update_layout(showlegend=False, yaxis_title="Total Exp (Years)")
-    return clean_layout(fig)
\ No newline at end of file
+@guard_inputs
+@timed_plot
+def plot_exp_by_grade(stats):
+    # One box per grade from precomputed stats (see data/quantiles.py): the
+    # figure carries five numbers and the outliers per grade, not the rows
+    colors = px.colors.qualitative.Prism
+    fig = go.Figure([
+        go.Box(
+            x=[row.Grade], q1=[row.Q1], median=[row.Median], q3=[row.Q3],
+            lowerfence=[row.Lower_Fence], upperfence=[row.Upper_Fence], y=[list(row.Outliers)],
+            boxpoints='outliers', name=row.Grade, marker_color=colors[i % len(colors)],
+            offsetgroup=row.Grade, alignmentgroup='True',
+            hovertemplate='Grade=%{x}<br>Total_Experience=%{y}<extra></extra>',
+        )
+        for i, row in enumerate(stats.itertuples(index=False))
+    ])
+    fig.update_layout(showlegend=False, boxmode='overlay', xaxis_title='Grade', yaxis_title="Total Exp (Years)")
+    return clean_layout(fig)
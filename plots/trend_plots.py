@@ -1,32 +1,25 @@
 # plots/trend_plots.py
 import plotly.express as px
 import plotly.graph_objects as go
+from plotly.subplots import make_subplots
 import pandas as pd
 from config import PRIMARY, SECONDARY, DANGER, SUCCESS, ACCENT
 from utils.plotting import clean_layout
+from utils.guards import guard_inputs
+from utils.metrics import timed_plot
+from data.cube import value_counts, total
+from data.schema import month_label
 
-def plot_hiring_trend(df):
+@guard_inputs
+@timed_plot
+def plot_hiring_trend(flows):
     """
     Line 1: Joined
     Line 2: Exited
+    flows: monthly Joined / Exited counts (see data/series.py).
     """
-    df['Join_Period'] = df['Join_Date'].dt.to_period('M')
-    joined_data = df.groupby('Join_Period').size().reset_index(name='Joined')
-    joined_data.rename(columns={'Join_Period': 'Month'}, inplace=True)
-
-    resigned_df = df[df['Status'] == 'Resigned'].copy()
-    resigned_df = resigned_df.dropna(subset=['Resignation_Date'])
-    
-    if not resigned_df.empty:
-        resigned_df['Exit_Period'] = resigned_df['Resignation_Date'].dt.to_period('M')
-        exited_data = resigned_df.groupby('Exit_Period').size().reset_index(name='Exited')
-        exited_data.rename(columns={'Exit_Period': 'Month'}, inplace=True)
-    else:
-        exited_data = pd.DataFrame(columns=['Month', 'Exited'])
-
-    trend_df = pd.merge(joined_data, exited_data, on='Month', how='outer').fillna(0)
-    trend_df = trend_df.sort_values('Month')
-    trend_df['Month_Str'] = trend_df['Month'].astype(str)
+    trend_df = flows.sort_values('Month')
+    trend_df = trend_df.assign(Month_Str=month_label(trend_df['Month']).astype(str))
 
     fig = px.line(
         trend_df, x='Month_Str', y=['Joined', 'Exited'], markers=True,
@@ -36,49 +29,101 @@ def plot_hiring_trend(df):
     fig.update_traces(line=dict(width=3))
     return clean_layout(fig, height=350)
 
-def plot_attrition_by_grade(df):
-    resigned = df[df['Status'] == 'Resigned']
+@guard_inputs
+@timed_plot
+def plot_headcount_trend(timeline):
+    """
+    Line: active headcount at month end
+    Bars: net change (joiners - leavers), on a second axis
+    timeline: monthly series from MonthlyFlows.timeline (see data/series.py).
+    """
+    months = month_label(timeline['Month']).astype(str)
+    fig = make_subplots(specs=[[{"secondary_y": True}]])
+    fig.add_trace(go.Bar(
+        x=months, y=timeline['Net_Change'], name='Net Change', opacity=0.5,
+        marker_color=[SUCCESS if v >= 0 else DANGER for v in timeline['Net_Change']]
+    ), secondary_y=True)
+    fig.add_trace(go.Scatter(
+        x=months, y=timeline['Headcount'], name='Headcount', mode='lines', line=dict(color=PRIMARY, width=3)
+    ), secondary_y=False)
+    fig.update_layout(legend_title=None, hovermode="x unified")
+    fig = clean_layout(fig, height=320)
+    fig.update_yaxes(title_text="Active Headcount", secondary_y=False)
+    fig.update_yaxes(title_text="Net Change", showgrid=False, secondary_y=True)
+    return fig
+
+@guard_inputs
+@timed_plot
+def plot_rolling_attrition(timeline):
+    """
+    Line: 12-month rolling attrition rate (%)
+    timeline: monthly series from MonthlyFlows.timeline (see data/series.py).
+    """
+    trend_df = timeline.dropna(subset=['Attrition_Rate'])
+    fig = go.Figure(go.Scatter(
+        x=month_label(trend_df['Month']).astype(str), y=trend_df['Attrition_Rate'],
+        mode='lines', line=dict(color=DANGER, width=3), fill='tozeroy', fillcolor='rgba(239, 68, 68, 0.08)',
+        hovertemplate='%{x}: %{y:.1f}%<extra></extra>'
+    ))
+    fig.update_layout(yaxis_title="Attrition Rate (%)", yaxis_ticksuffix="%")
+    return clean_layout(fig, height=320)
+
+@guard_inputs
+@timed_plot
+def plot_attrition_by_grade(cells):
+    resigned = cells[cells['Status'] == 'Resigned']
     if resigned.empty: return go.Figure()
     
-    attr_grade = resigned['Grade'].value_counts().reset_index()
+    attr_grade = value_counts(resigned, 'Grade').reset_index()
     attr_grade.columns = ['Grade', 'Count']
     fig = px.bar(attr_grade, x='Grade', y='Count', color='Grade', text='Count', 
                  color_discrete_sequence=px.colors.sequential.Reds_r)
     return clean_layout(fig, height=300)
 
-def plot_attrition_by_dept(df):
-    resigned = df[df['Status'] == 'Resigned']
+@guard_inputs
+@timed_plot
+def plot_attrition_by_dept(cells):
+    resigned = cells[cells['Status'] == 'Resigned']
     if resigned.empty: return go.Figure()
 
-    dept_counts = resigned['Department'].value_counts().reset_index()
+    dept_counts = value_counts(resigned, 'Department').reset_index()
     dept_counts.columns = ['Department', 'Count']
     
     fig = px.pie(dept_counts, names='Department', values='Count', hole=0.6,
                  color_discrete_sequence=px.colors.qualitative.Pastel)
     
-    total_exits = len(resigned)
+    total_exits = total(resigned)
     fig.update_layout(annotations=[dict(text=f"{total_exits}", x=0.5, y=0.5, font_size=20, showarrow=False)])
     return clean_layout(fig, height=300)
 
-def plot_tenure_risk(df):
-    resigned = df[df['Status'] == 'Resigned']
-    if resigned.empty: return go.Figure()
-
-    fig = px.histogram(resigned, x='Tenure_Years', nbins=15, 
-                       color_discrete_sequence=[ACCENT], 
-                       opacity=0.8)
-    fig.update_layout(xaxis_title="Years before Resignation", yaxis_title="Count of Exits", bargap=0.1)
-    return clean_layout(fig, height=300)
+@guard_inputs
+@timed_plot
+def plot_survival(curves, colors=None):
+    """
+    One line per group: share of employees still employed after N months of tenure.
+    curves: Kaplan-Meier curves from data/survival.py (Group, Tenure_Months, Survival, At_Risk).
+    """
+    if curves.empty: return go.Figure()
+    fig = px.line(
+        curves, x='Tenure_Months', y='Survival', color='Group', line_shape='hv',
+        color_discrete_sequence=colors or [PRIMARY, DANGER, SUCCESS, ACCENT, SECONDARY, '#8B5CF6', '#64748B', '#EC4899'],
+        custom_data=['At_Risk']
+    )
+    fig.update_traces(line=dict(width=2.5), hovertemplate='%{y:.1f}% after %{x} months (%{customdata[0]:,} at risk)')
+    fig.update_layout(xaxis_title="Months of Tenure", yaxis_title="Still Employed (%)", legend_title=None, hovermode="x unified")
+    return clean_layout(fig, height=350)
 
-def plot_top_exit_sites(df):
+@guard_inputs
+@timed_plot
+def plot_top_exit_sites(cells):
     """
     NEW PLOT: Shows the specific sites with the highest number of resignations.
     """
-    resigned = df[df['Status'] == 'Resigned']
+    resigned = cells[cells['Status'] == 'Resigned']
     if resigned.empty: return go.Figure()
 
     # Get Top 5 Sites by Exits
-    site_exits = resigned['Site_Name'].value_counts().nlargest(5).reset_index()
+    site_exits = value_counts(resigned, 'Site_Name').nlargest(5).reset_index()
     site_exits.columns = ['Site', 'Exits']
 
     fig = px.bar(
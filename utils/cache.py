@@ -0,0 +1,84 @@
+# utils/cache.py
+import threading
+from collections import OrderedDict
+from config import FIGURE_CACHE_SIZE
+
+
+def canonical_filter(values):
+    """
+    Order-insensitive form of a dropdown selection: None, [] and any ordering
+    of the same values map to the same key.
+    """
+    return tuple(sorted(values)) if values else ()
+
+
+class FigureCache:
+    """
+    Bounded LRU cache for rendered figures and page layouts.
+
+    Entries are tagged with the dataset version token; setting a new version
+    drops everything rendered from the old data.
+    """
+    def __init__(self, maxsize=FIGURE_CACHE_SIZE):
+        self.maxsize = maxsize
+        self.version = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def key(self, name, zones=None, grades=None):
+        return (name, canonical_filter(zones), canonical_filter(grades))
+
+    def set_version(self, version):
+        with self._lock:
+            if version != self.version:
+                self.version = version
+                self._entries.clear()
+
+    def get_or_build(self, key, builder):
+        """
+        Returns the cached value for `key`, calling `builder()` on a miss.
+        Two requests missing on the same key may both build; the last one wins.
+        """
+        with self._lock:
+            version = self.version
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+
+        value = builder()
+
+        with self._lock:
+            # Don't store results rendered from data that was replaced meanwhile
+            if version == self.version:
+                self._entries[key] = value
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+                    self.evictions += 1
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'version': self.version,
+                'size': len(self._entries),
+                'maxsize': self.maxsize,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+# Shared by all callbacks in this process
+figure_cache = FigureCache()
@@ -0,0 +1,126 @@
+# utils/clientside.py
+"""
+Client-side filtering mode (OPTICK_CLIENTSIDE=1).
+
+The KPI cards and count charts on Overview and Trends only need headcounts
+summed over the selected zones and grades. In this mode the server sends,
+once per dataset version, a compact table per chart (counts by Zone x Grade
+x key, plus the monthly hire/exit arrays) and the unfiltered figures as
+templates into a dcc.Store. Filter changes are handled by clientside
+callbacks (assets/clientside.js) that sum the selected slices and swap the
+new arrays into the template, so they never reach the server.
+
+Charts that need employee rows (histograms, retention curves, the map and
+the roster) stay on the server.
+"""
+import numpy as np
+from dash import Input, Output, State, ClientsideFunction, no_update
+from config import SUCCESS, DANGER
+from data.series import ROLLING_MONTHS
+from utils.metrics import timed_callback
+
+STORE_ID = "counts-store"
+# The version of the tables in STORE_ID, kept apart so checking it doesn't post the tables back
+VERSION_STORE_ID = "counts-store-version"
+NAMESPACE = "optick"
+
+
+def zone_grade_counts(cells, columns, zones, grades, value='Count'):
+    """
+    Sums of `value` per (zone, grade, key), where a key is a combination of
+    `columns`: {'keys': [...], 'values': [zone][grade][key]}.
+    """
+    grouped = cells.groupby(['Zone', 'Grade'] + columns, observed=True)[value].sum()
+    grouped = grouped[grouped != 0]
+    if columns:
+        key_values = grouped.index.droplevel(['Zone', 'Grade'])
+        # Keys in category order, as the server-side groupby would list them
+        keys = key_values.unique().sort_values()
+        key_codes = keys.get_indexer(key_values)
+        keys = [list(k) if isinstance(k, tuple) else k for k in keys.tolist()]
+    else:
+        keys, key_codes = ['total'], np.zeros(len(grouped), dtype=np.int64)
+    zone_codes = {z: i for i, z in enumerate(zones)}
+    grade_codes = {g: i for i, g in enumerate(grades)}
+    values = np.zeros((len(zones), len(grades), len(keys)))
+    np.add.at(values, (
+        [zone_codes[z] for z in grouped.index.get_level_values('Zone')],
+        [grade_codes[g] for g in grouped.index.get_level_values('Grade')],
+        key_codes,
+    ), grouped.to_numpy())
+    return {'keys': keys, 'values': np.round(values, 1).tolist()}
+
+
+def client_tables(cells, flows):
+    """
+    Everything the clientside callbacks aggregate, for the whole dataset.
+    """
+    zones, grades = [list(c) for c in flows.categories]
+    resigned = cells[cells['Status'] == 'Resigned']
+
+    def counts(frame, columns, value='Count'):
+        return zone_grade_counts(frame, columns, zones, grades, value)
+
+    return {
+        'zones': zones,
+        'grades': grades,
+        'status': counts(cells, ['Status']),
+        'experience': counts(cells, [], 'Experience_Sum'),
+        'software': counts(cells, ['Software_User']),
+        'role': counts(cells, ['Role']),
+        'gender': counts(cells, ['Gender']),
+        'role_software': counts(cells, ['Role', 'Software_User']),
+        # Grade is also a slicing dimension: key on a copy of it
+        'exits_grade': counts(resigned.assign(Exit_Grade=resigned['Grade']), ['Exit_Grade']),
+        'exits_department': counts(resigned, ['Department']),
+        'exits_site': counts(resigned, ['Site_Name']),
+        # Zone x Grade x month, as in MonthlyFlows
+        'flows': {'start': flows.start, 'hires': flows.hires.tolist(), 'exits': flows.exits.tolist()},
+    }
+
+
+def client_store(view, outputs, version):
+    """
+    Store contents for the unfiltered `view`: the tables plus a template
+    figure per clientside output (the plotly template is sent once).
+    """
+    figures = {}
+    template = None
+    for (component_id, prop), (build, _) in outputs.items():
+        if prop != 'figure':
+            continue
+        fig = build(view).to_plotly_json()
+        template = fig['layout'].pop('template', template)
+        figures[component_id] = fig
+    return {
+        'version': version,
+        'tables': client_tables(view.cells, view.store.flows),
+        'figures': figures,
+        'template': template,
+        'options': {'rolling_months': ROLLING_MONTHS, 'up_color': SUCCESS, 'down_color': DANGER},
+    }
+
+
+def register_clientside(app, outputs, build_store, current_version):
+    """
+    `outputs` maps (component id, property) -> (server builder, JS function
+    name). The store is refreshed on navigation when the dataset version has
+    moved on (e.g. after ingested events); `build_store()` returns its contents.
+    """
+    @app.callback(
+        [Output(STORE_ID, "data"), Output(VERSION_STORE_ID, "data")],
+        Input("url", "pathname"), State(VERSION_STORE_ID, "data"),
+    )
+    @timed_callback
+    def refresh_store(pathname, version):
+        if version is not None and version == current_version():
+            return no_update, no_update
+        store = build_store()
+        return store, store['version']
+
+    for (component_id, prop), (_, function) in outputs.items():
+        app.clientside_callback(
+            ClientsideFunction(NAMESPACE, function),
+            Output(component_id, prop),
+            [Input("zone-filter", "value"), Input("grade-filter", "value"), Input(STORE_ID, "data")],
+        )
@@ -0,0 +1,97 @@
+# utils/compression.py
+"""
+Response compression for the Flask server behind Dash.
+
+Callback responses (figure JSON), the map geometry and the Dash/plotly.js
+bundles are compressed when the client accepts it: brotli when the `brotli`
+package is installed, gzip otherwise. Small bodies, streamed files and
+responses that are already encoded are sent as they are. Responses served
+from fingerprinted URLs (a year-long max-age) never change, so their
+compressed bodies are kept and reused.
+"""
+import gzip
+import threading
+from collections import OrderedDict
+
+from flask import request
+
+try:
+    import brotli
+except ImportError:  # gzip only
+    brotli = None
+
+COMPRESSIBLE_TYPES = ('application/json', 'application/geo+json', 'application/javascript', 'text/')
+MIN_SIZE = 1024
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+IMMUTABLE_CACHE_SIZE = 64
+
+
+def choose_encoding(accept_encoding):
+    """
+    'br' or 'gzip' from an Accept-Encoding header, None if neither is accepted.
+    """
+    accepted = {}
+    for part in (accept_encoding or '').lower().split(','):
+        name, _, params = part.strip().partition(';')
+        q = 1.0
+        if params.strip().startswith('q='):
+            try:
+                q = float(params.strip()[2:])
+            except ValueError:
+                q = 0.0
+        accepted[name.strip()] = q
+    if brotli is not None and accepted.get('br', 0) > 0:
+        return 'br'
+    if accepted.get('gzip', 0) > 0:
+        return 'gzip'
+    return None
+
+
+def compress(body, encoding):
+    if encoding == 'br':
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+
+
+def register_compression(server, min_size=MIN_SIZE):
+    """
+    Adds an after_request hook that compresses eligible responses of `server`.
+    """
+    immutable = OrderedDict()
+    lock = threading.Lock()
+
+    @server.after_request
+    def compress_response(response):
+        if (response.status_code != 200 or response.direct_passthrough
+                or 'Content-Encoding' in response.headers
+                or not response.mimetype.startswith(COMPRESSIBLE_TYPES)):
+            return response
+        response.vary.add('Accept-Encoding')
+        encoding = choose_encoding(request.headers.get('Accept-Encoding'))
+        if encoding is None or (response.content_length or min_size) < min_size:
+            return response
+        body = response.get_data()
+        if len(body) < min_size:
+            return response
+
+        key = (request.full_path, encoding) if 'max-age=31536000' in response.headers.get('Cache-Control', '') else None
+        with lock:
+            compressed = immutable.get(key) if key else None
+        if compressed is None:
+            compressed = compress(body, encoding)
+            if key:
+                with lock:
+                    immutable[key] = compressed
+                    while len(immutable) > IMMUTABLE_CACHE_SIZE:
+                        immutable.popitem(last=False)
+
+        response.set_data(compressed)
+        response.headers['Content-Encoding'] = encoding
+        if response.headers.get('ETag'):
+            # Same resource, different bytes: the strong validator no longer applies
+            etag, weak = response.get_etag()
+            response.set_etag(etag, weak=True)
+        return response
+
+    return compress_response
@@ -0,0 +1,89 @@
+# utils/guards.py
+"""
+Input-mutation guard for the plot functions.
+
+The views handed to the plots share memory with the store's frame, so a plot
+must never write to its inputs. With OPTICK_GUARD_INPUTS=1 every function
+decorated with `guard_inputs` fingerprints its DataFrame / Series arguments
+before and after the call and raises InputMutated if one changed.
+
+    python -m utils.guards    # renders every page output with the guard on; exits 1 on a
+                              # mutation or on an output that fails to render
+"""
+import functools
+import inspect
+import sys
+
+import pandas as pd
+
+from config import GUARD_INPUTS
+
+ENABLED = GUARD_INPUTS
+
+# Every selection, a narrow one, and one that matches nobody (the sidebar offers
+# every zone and grade, so an empty view is reachable on small datasets)
+FILTER_SETS = [
+    {},
+    {'Zone': ['North'], 'Grade': ['L1 (Associate)', 'L2 (Skilled)']},
+    {'Zone': ['(nobody)']},
+]
+
+
+class InputMutated(AssertionError):
+    pass
+
+
+def fingerprint(obj):
+    """
+    Columns, dtypes, index and a hash of the values of a frame or series.
+    """
+    frame = obj.to_frame() if isinstance(obj, pd.Series) else obj
+    return (
+        tuple(frame.columns), tuple(str(t) for t in frame.dtypes), frame.shape,
+        int(pd.util.hash_pandas_object(frame, index=True).sum()),
+    )
+
+
+def guard_inputs(func):
+    signature = inspect.signature(func)
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if not ENABLED:
+            return func(*args, **kwargs)
+        inputs = {name: value for name, value in signature.bind(*args, **kwargs).arguments.items()
+                  if isinstance(value, (pd.DataFrame, pd.Series))}
+        before = {name: fingerprint(value) for name, value in inputs.items()}
+        result = func(*args, **kwargs)
+        for name, value in inputs.items():
+            if fingerprint(value) != before[name]:
+                raise InputMutated(f"{func.__module__}.{func.__name__} modified its argument {name!r}")
+        return result
+    return wrapper
+
+
+def main():
+    global ENABLED
+    ENABLED = True
+    import index
+    store = index.dataset.get()
+    failures = 0
+    base = fingerprint(store.df)
+    for path, page in index.PAGES.items():
+        for filters in FILTER_SETS:
+            view = index.WorkforceView(store, filters, index.geo)
+            for (component_id, prop), build in page.OUTPUTS.items():
+                try:
+                    build(view)
+                except Exception as e:
+                    failures += 1
+                    print(f"{path} {component_id}.{prop} {filters}: {type(e).__name__}: {e}")
+    if fingerprint(store.df) != base:
+        failures += 1
+        print("The workforce frame changed while rendering")
+    print(f"{failures} failure(s) found" if failures else "No plot modified its inputs or failed")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,210 @@
+# utils/metrics.py
+"""
+Callback timing: Prometheus histograms on /metrics and one structured log
+line per callback request.
+
+Every callback request is broken down into spans: the callback body
+(`timed_callback`), the filter steps of the view, each plot_* call
+(`timed_plot`) and page layout construction. What remains of the request
+time once the callback body returns is Dash's dispatch and the JSON
+serialization of the response. Spans feed the histograms and are collected
+on flask.g so the request's log line can report them together:
+
+    time=... level=INFO logger=optick.callbacks msg=callback output=overview-role-graph.figure
+        status=200 total_ms=61.2 callback_ms=57.9 filter_ms=0.4 plot_ms=56.8
+        plots=plot_role_distribution serialize_ms=3.3 bytes=1127
+
+Histograms are per process: under gunicorn each worker answers /metrics
+with its own counts.
+"""
+import bisect
+import functools
+import logging
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+from flask import Response, g, has_request_context, request
+
+CALLBACK_PATH = '/_dash-update-component'
+SECONDS_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+BYTES_BUCKETS = (1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+log = logging.getLogger("optick.callbacks")
+
+
+class Histogram:
+    """
+    Prometheus histogram with a fixed set of label names.
+    """
+    def __init__(self, name, documentation, labels, buckets=SECONDS_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(str(labels.get(label, '')) for label in self.labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                # Per-bucket counts (the last one is +Inf), sum
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][bisect.bisect_left(self.buckets, value)] += 1
+            series[1] += value
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = sorted((key, list(counts), total) for key, (counts, total) in self._series.items())
+        for key, counts, total in series:
+            labels = ','.join(f'{name}="{_escape(value)}"' for name, value in zip(self.labels, key))
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += count
+                le = '+Inf' if bound == float('inf') else f'{bound:g}'
+                lines.append(f'{self.name}_bucket{{{labels + "," if labels else ""}le="{le}"}} {cumulative}')
+            lines.append(f'{self.name}_sum{{{labels}}} {total:.6f}')
+            lines.append(f'{self.name}_count{{{labels}}} {cumulative}')
+        return '\n'.join(lines)
+
+
+def _escape(value):
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+REQUEST_SECONDS = Histogram('optick_callback_request_seconds', 'Total time of a Dash callback request.', ['output'])
+CALLBACK_SECONDS = Histogram('optick_callback_seconds', 'Time in the callback body (cache lookup, filtering, plotting).', ['output'])
+FILTER_SECONDS = Histogram('optick_filter_seconds', 'Time building the filtered inputs of the charts (rows, cube slice, series, survival curves).', ['step'])
+PLOT_SECONDS = Histogram('optick_plot_seconds', 'Time in each plot_* function.', ['plot'])
+LAYOUT_SECONDS = Histogram('optick_layout_seconds', 'Time building a page layout.', ['page'])
+SERIALIZE_SECONDS = Histogram('optick_serialize_seconds', 'Request time after the callback body returned (Dash dispatch and JSON serialization).', ['output'])
+RESPONSE_BYTES = Histogram('optick_response_bytes', 'Callback response size before compression.', ['output'], BYTES_BUCKETS)
+METRICS = [REQUEST_SECONDS, CALLBACK_SECONDS, FILTER_SECONDS, PLOT_SECONDS, LAYOUT_SECONDS, SERIALIZE_SECONDS, RESPONSE_BYTES]
+
+
+def callback_output():
+    """
+    The output id of the Dash callback being served ('' outside one).
+    """
+    if not has_request_context() or request.path != CALLBACK_PATH:
+        return ''
+    body = request.get_json(silent=True) or {}
+    return body.get('output', '')
+
+
+@contextmanager
+def span(histogram, **labels):
+    """
+    Times the block into `histogram`, and into the current request's spans.
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        histogram.observe(elapsed, **labels)
+        if has_request_context():
+            g.setdefault('optick_spans', []).append((histogram, labels, elapsed))
+
+
+def timed_plot(func):
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with span(PLOT_SECONDS, plot=func.__name__):
+            return func(*args, **kwargs)
+    return wrapper
+
+
+def timed_callback(func):
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with span(CALLBACK_SECONDS, output=callback_output() or func.__name__):
+            return func(*args, **kwargs)
+    return wrapper
+
+
+def _ms(spans, histogram):
+    return sum((elapsed for h, _, elapsed in spans if h is histogram), 0.0) * 1000
+
+
+def register_metrics(server):
+    """
+    Times callback requests on `server` and serves the histograms on /metrics.
+    """
+    @server.before_request
+    def start_timer():
+        g.optick_start = time.perf_counter()
+
+    @server.after_request
+    def record_request(response):
+        start = g.get('optick_start')
+        if start is None or request.path != CALLBACK_PATH:
+            return response
+        total = time.perf_counter() - start
+        output = callback_output()
+        spans = g.get('optick_spans', [])
+        size = response.content_length or 0
+        REQUEST_SECONDS.observe(total, output=output)
+        RESPONSE_BYTES.observe(size, output=output)
+        fields = {'output': output, 'status': response.status_code, 'total_ms': total * 1000}
+        callback_ms = _ms(spans, CALLBACK_SECONDS)
+        if callback_ms:
+            serialize = total - callback_ms / 1000
+            SERIALIZE_SECONDS.observe(serialize, output=output)
+            fields.update(callback_ms=callback_ms, filter_ms=_ms(spans, FILTER_SECONDS), plot_ms=_ms(spans, PLOT_SECONDS))
+            plots = sorted({labels['plot'] for h, labels, _ in spans if h is PLOT_SECONDS})
+            if plots:
+                fields['plots'] = ','.join(plots)
+            fields['serialize_ms'] = serialize * 1000
+        fields['bytes'] = size
+        log.info("callback", extra={'fields': fields})
+        return response
+
+    @server.route("/metrics")
+    def metrics():
+        body = '\n\n'.join(metric.render() for metric in METRICS) + '\n'
+        return Response(body, mimetype='text/plain; version=0.0.4')
+
+    return record_request
+
+
+class LogfmtFormatter(logging.Formatter):
+    """
+    key=value lines; `extra={'fields': {...}}` adds fields to a record.
+    """
+    def format(self, record):
+        fields = {
+            'time': self.formatTime(record, '%Y-%m-%dT%H:%M:%S'),
+            'level': record.levelname,
+            'logger': record.name,
+            'msg': record.getMessage(),
+            **getattr(record, 'fields', {}),
+        }
+        line = ' '.join(f'{key}={_logfmt(value)}' for key, value in fields.items())
+        if record.exc_info:
+            line += '\n' + self.formatException(record.exc_info)
+        return line
+
+
+def _logfmt(value):
+    text = f'{value:.1f}' if isinstance(value, float) else str(value)
+    if not text or any(c in text for c in ' ="'):
+        return '"' + text.replace('"', '\\"') + '"'
+    return text
+
+
+def configure_logging(level="INFO"):
+    """
+    Structured logs on stderr, unless the host (e.g. a test runner) set up logging already.
+    """
+    root = logging.getLogger()
+    if root.handlers:
+        return
+    handler = logging.StreamHandler(sys.stderr)
+    handler.setFormatter(LogfmtFormatter())
+    root.addHandler(handler)
+    root.setLevel(level)
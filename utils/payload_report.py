@@ -0,0 +1,120 @@
+# utils/payload_report.py
+"""
+Payload-size report: what each page costs on the wire.
+
+Renders every page through the Dash callback endpoint (Flask test client),
+once unfiltered and once after a filter change, and reports per output the
+raw JSON size, the size after compression and how many numeric trace arrays
+went out as plain JSON lists instead of typed (base64 "bdata") arrays.
+
+    python -m utils.payload_report                  # table per page and output
+    python -m utils.payload_report --json           # the same, machine-readable
+    python -m utils.payload_report --budget 200000  # exits 1 if a page sends more (compressed bytes)
+"""
+import argparse
+import json
+import sys
+
+from utils.compression import choose_encoding, compress
+
+FILTER_CHANGE = {'zone-filter': ['North', 'South'], 'grade-filter': ['L1 (Associate)']}
+
+
+def plain_numeric_arrays(node):
+    """
+    Number of lists of numbers in the traces of a figure JSON (typed arrays
+    are dicts with 'bdata'; layout and domain bounds are not data).
+    """
+    if isinstance(node, dict):
+        return sum(plain_numeric_arrays(v) for k, v in node.items() if k not in ('layout', 'domain'))
+    if isinstance(node, list):
+        if len(node) > 1 and all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in node):
+            return 1
+        return sum(plain_numeric_arrays(v) for v in node)
+    return 0
+
+
+class PayloadReport:
+    def __init__(self, server, encoding=None):
+        self.client = server.test_client()
+        self.encoding = encoding or choose_encoding('br, gzip')
+
+    def post(self, component_id, prop, inputs, changed):
+        body = {
+            'output': f'{component_id}.{prop}', 'outputs': {'id': component_id, 'property': prop},
+            'inputs': inputs, 'changedPropIds': changed, 'state': [],
+        }
+        response = self.client.post('/_dash-update-component', json=body)
+        if response.status_code == 204:
+            return {'raw': 0, 'compressed': 0, 'plain_arrays': 0}
+        if response.status_code != 200:
+            raise RuntimeError(f"{component_id}.{prop}: HTTP {response.status_code}")
+        raw = response.get_data()
+        return {
+            'raw': len(raw),
+            'compressed': len(compress(raw, self.encoding)),
+            'plain_arrays': plain_numeric_arrays(json.loads(raw)),
+        }
+
+    @staticmethod
+    def filter_inputs(filters):
+        return [{'id': component_id, 'property': 'value', 'value': filters.get(component_id)}
+                for component_id in ('zone-filter', 'grade-filter')]
+
+    def page(self, path, outputs):
+        """
+        {'initial': {...}, 'filter_change': {...}} totals plus a row per output.
+        """
+        self.client.get('/')
+        shell = self.post('page-content', 'children', [{'id': 'url', 'property': 'pathname', 'value': path}], ['url.pathname'])
+        result = {}
+        for stage, filters, changed in (('initial', {}, []), ('filter_change', FILTER_CHANGE, ['zone-filter.value'])):
+            rows = {f'{component_id}.{prop}': self.post(component_id, prop, self.filter_inputs(filters), changed)
+                    for component_id, prop in outputs}
+            if stage == 'initial':
+                rows = {'page-content.children': shell, **rows}
+            total = {key: sum(row[key] for row in rows.values()) for key in ('raw', 'compressed', 'plain_arrays')}
+            result[stage] = {'total': total, 'outputs': rows}
+        return result
+
+
+def print_report(report, encoding):
+    for path, stages in report.items():
+        print(f"\n{path}")
+        for stage, result in stages.items():
+            total = result['total']
+            print(f"  {stage:<44}{total['raw']:>12,d} B raw{total['compressed']:>10,d} B {encoding}")
+            for output, row in sorted(result['outputs'].items(), key=lambda item: -item[1]['raw']):
+                note = f"  {row['plain_arrays']} plain numeric array(s)" if row['plain_arrays'] else ''
+                print(f"    {output:<42}{row['raw']:>12,d}{row['compressed']:>16,d}{note}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--json', action='store_true', help="print the report as JSON")
+    parser.add_argument('--encoding', choices=['br', 'gzip'], help="compression to measure (default: best available)")
+    parser.add_argument('--budget', type=int, help="fail if a page's initial compressed payload exceeds this many bytes")
+    args = parser.parse_args(argv)
+
+    import index
+    index.dataset.get()
+    reporter = PayloadReport(index.server, args.encoding)
+    report = {}
+    for path, page in index.PAGES.items():
+        outputs = [key for key in page.OUTPUTS if key not in index.client_outputs]
+        report[path] = reporter.page(path, outputs)
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report, reporter.encoding)
+
+    over = [path for path, stages in report.items()
+            if args.budget is not None and stages['initial']['total']['compressed'] > args.budget]
+    for path in over:
+        print(f"{path}: {report[path]['initial']['total']['compressed']:,d} B over the {args.budget:,d} B budget", file=sys.stderr)
+    sys.exit(1 if over else 0)
+
+
+if __name__ == "__main__":
+    main()
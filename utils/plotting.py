@@ -1,4 +1,9 @@
 # utils/plotting.py
+import math
+import numpy as np
+import pandas as pd
+import plotly.express as px
+from dash import Patch
 from config import TEXT_MAIN
 
 def clean_layout(fig, height=300, bargap=0.3):
@@ -15,4 +20,131 @@ def clean_layout(fig, height=300, bargap=0.3):
         height=height, 
         bargap=bargap
     )
-    return fig
\ No newline at end of file
+    return fig
+
+
+# --- Aggregate before plotting ---
+# px.histogram on raw rows ships every value to the browser, where plotly.js
+# bins them. These helpers pick the same bins and count on the server, so a
+# histogram costs O(bins) on the wire whatever the number of employees.
+
+def _js_increment(x, delta):
+    # plotly.js Lib.increment: x + delta without the float noise of repeated steps
+    n = 1 / abs(delta)
+    value = (n * x + n * delta) / n if n > 1 else x + delta
+    text = lambda v: repr(v).removesuffix('.0')
+    if len(text(value)) > 16 and len(text(value)) >= len(text(delta)) + len(text(x)):
+        value = float(f'{value:.12g}')
+    return value
+
+
+def _near_edge(values, start, size):
+    # Within 1% of a bin edge: (1 + offset%) % 100 < 2, where JS % keeps the
+    # sign of the dividend, so anything below the first edge counts too
+    u = 1 + (values - start) * 100 / size
+    return (u < 0) | (u - 100 * np.floor(u / 100) < 2)
+
+
+def autobin(values, nbins):
+    """
+    (start, end, size) of the bins plotly.js picks for a histogram of `values`
+    with `nbins` requested (Axes.autoBin): a "nice" size near span / nbins,
+    edges on multiples of it, shifted by half a bin (or half a unit) when the
+    values are integers or crowd the edges.
+    """
+    values = np.asarray(values, dtype=float)
+    lo, hi = float(values.min()), float(values.max())
+    rough = (hi - lo) / nbins
+    if rough > 0:
+        base = 10 ** math.floor(math.log10(rough))
+        size = base * next((m for m in (2, 5) if m > rough / base), 10)
+    else:
+        size = 1
+    first = math.ceil((lo - (hi - lo) * 1e-4) / size) * size
+    start = _js_increment(first, -size)
+
+    count = len(values)
+    if np.array_equal(np.floor(values), values):
+        if size < 1:
+            start = lo - 0.5 * size
+        else:
+            start -= 0.5
+            if start + size < lo:
+                start += size
+    else:
+        middles = np.count_nonzero(_near_edge(values + size / 2, start, size))
+        if middles < count * 0.1 and (_near_edge(np.array([lo, hi]), start, size).any()
+                                      or np.count_nonzero(_near_edge(values, start, size)) > count * 0.3):
+            shift = size / 2
+            start += shift if start + shift < lo else -shift
+    bins = 1 + math.floor((hi - start) / size)
+    return start, start + bins * size, size
+
+
+def histogram_points(values, nbins):
+    """
+    Server-side histogram of `values` on the plotly.js bins: (x, y, bins) where
+    x holds the lowest and highest value of each non-empty bin and y its count
+    (then 0), so a histfunc='sum' trace over them draws the same bars and the
+    same hover ranges as the raw values would.
+    """
+    values = np.asarray(values, dtype=float)
+    values = values[~np.isnan(values)]
+    if not len(values):
+        return np.array([]), np.array([], dtype=np.int64), None
+    start, end, size = autobin(values, nbins)
+    codes = np.floor((values - start) / size + 1e-9).astype(np.int64)
+    n = int(round((end - start) / size))
+    counts = np.bincount(codes, minlength=n)
+    low, high = np.full(n, np.inf), np.full(n, -np.inf)
+    np.minimum.at(low, codes, values)
+    np.maximum.at(high, codes, values)
+    filled = np.flatnonzero(counts)
+    spread = filled[high[filled] > low[filled]]
+    x = np.concatenate([low[filled], high[spread]])
+    y = np.concatenate([counts[filled], np.zeros(len(spread), dtype=np.int64)])
+    order = np.argsort(x, kind='stable')
+    return x[order], y[order], dict(start=start, end=end, size=size)
+
+
+def binned_histogram(values, name, nbins, **kwargs):
+    """
+    px.histogram(x=values, nbins=nbins) as it would render, from the counts of
+    histogram_points. `name` labels the x values; kwargs go to px.histogram.
+    """
+    x, y, bins = histogram_points(values, nbins)
+    if not len(x):
+        # Nothing to bin: px can't take empty x and y, an empty column draws the empty histogram
+        fig = px.histogram(pd.DataFrame({name: pd.Series([], dtype=float)}), x=name, nbins=nbins, **kwargs)
+        fig.update_layout(yaxis_title='count')
+        return fig
+    fig = px.histogram(x=x, y=y, histfunc='sum', labels={'x': name}, **kwargs)
+    fig.update_traces(hovertemplate=f'{name}=%{{x}}<br>count=%{{y}}<extra></extra>', xbins=bins)
+    fig.update_layout(yaxis_title='count')
+    return fig
+
+
+def figure_patch(fig, static_trace_keys=('geojson',)):
+    """
+    Partial update for a figure that is already on screen: swaps the trace data
+    and data-dependent annotations, leaving the rendered layout (and template) alone.
+    Traces that carry one of `static_trace_keys` are updated attribute by attribute
+    so that heavy static payloads (map geometry) are not sent again; a URL is cheap
+    and is patched like any other value. Map figures also move their viewport.
+    """
+    patched = Patch()
+    data = fig.to_plotly_json()['data']
+    def is_static(key, value):
+        return key in static_trace_keys and not isinstance(value, str)
+    if any(is_static(key, value) for trace in data for key, value in trace.items()):
+        for i, trace in enumerate(data):
+            for key, value in trace.items():
+                if not is_static(key, value):
+                    patched['data'][i][key] = value
+    else:
+        patched['data'] = data
+    patched['layout']['annotations'] = fig.layout.annotations
+    if fig.layout.mapbox.center is not None:
+        patched['layout']['mapbox']['center'] = fig.layout.mapbox.center.to_plotly_json()
+        patched['layout']['mapbox']['zoom'] = fig.layout.mapbox.zoom
+    return patched
@@ -0,0 +1,62 @@
+# utils/render.py
+"""
+Concurrent construction of a page's outputs.
+
+The outputs of a page are independent: each runs its own aggregation and
+figure construction over the same filtered view. `render_outputs` builds the
+view's shared inputs (filtered rows, cube slice, series) once, up front, then
+builds the outputs on a bounded thread pool, so a page costs about its
+slowest output rather than the sum. numpy and pandas release the GIL in
+their kernels; figure validation in plotly is pure Python and still
+interleaves, so the gain grows with the share of the work spent in pandas.
+
+OPTICK_RENDER_WORKERS sets the pool size; 1 (or 0) builds serially in the
+calling thread.
+"""
+import contextvars
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from config import RENDER_WORKERS
+
+_pool = None
+_lock = threading.Lock()
+
+
+def _reset_pool():
+    # The pool's threads don't survive a fork: a forked worker starts its own
+    global _pool
+    _pool = None
+
+
+os.register_at_fork(after_in_child=_reset_pool)
+
+
+def render_pool():
+    global _pool
+    with _lock:
+        if _pool is None:
+            _pool = ThreadPoolExecutor(RENDER_WORKERS, thread_name_prefix="render")
+        return _pool
+
+
+def render_outputs(view, outputs, inputs=(), workers=None):
+    """
+    {key: build(view)} for `outputs` ({key: build}). `inputs` names the view
+    properties the builders share ('rows', 'cells', 'flows', 'timeline'); they
+    are computed before fanning out so no two threads filter the same data.
+    """
+    for name in inputs:
+        getattr(view, name)
+    workers = RENDER_WORKERS if workers is None else workers
+    if workers <= 1 or len(outputs) <= 1:
+        return {key: build(view) for key, build in outputs.items()}
+    pool = render_pool() if workers == RENDER_WORKERS else ThreadPoolExecutor(workers, thread_name_prefix="render")
+    # Each build runs in a copy of the caller's context, so request-scoped timing spans still reach it
+    futures = {key: pool.submit(contextvars.copy_context().run, build, view) for key, build in outputs.items()}
+    try:
+        return {key: future.result() for key, future in futures.items()}
+    finally:
+        if pool is not _pool:
+            pool.shutdown(wait=False)
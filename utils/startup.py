@@ -0,0 +1,95 @@
+# utils/startup.py
+"""
+Startup timing and the background dataset load.
+
+`startup_timer` records how long each startup phase took (module imports,
+data load, index builds). The breakdown is printed once the data is ready
+and served on /health. `BackgroundLoad` runs the dataset load in a thread so
+the server answers health checks and serves the page shell while it runs.
+"""
+import os
+import sys
+import threading
+import time
+import traceback
+from contextlib import contextmanager
+
+# Close to interpreter start: index.py imports this module first
+PROCESS_START = time.perf_counter()
+
+
+class StartupTimer:
+    def __init__(self, start=PROCESS_START):
+        self.start = start
+        self.phases = {}
+        self.ready_ms = None
+
+    @contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = round((time.perf_counter() - start) * 1000, 1)
+
+    def mark_ready(self):
+        self.ready_ms = round((time.perf_counter() - self.start) * 1000, 1)
+
+    def report(self):
+        return {'phases_ms': dict(self.phases), 'ready_ms': self.ready_ms}
+
+    def print_report(self):
+        print("Startup timing:")
+        for name, ms in self.phases.items():
+            print(f"  {name:<28}{ms:>10.1f} ms")
+        if self.ready_ms is not None:
+            print(f"  {'ready after':<28}{self.ready_ms:>10.1f} ms")
+        sys.stdout.flush()
+
+
+startup_timer = StartupTimer()
+
+
+class BackgroundLoad:
+    """
+    Runs `load()` once in a daemon thread; `get()` waits for it and returns
+    its result, re-raising its failure. If the process forks before the load
+    finished (the thread doesn't survive the fork), the child starts its own.
+    """
+    def __init__(self, load, name="data-load"):
+        self._load = load
+        self._name = name
+        self._result = None
+        self._error = None
+        self._start()
+        os.register_at_fork(after_in_child=self._after_fork)
+
+    def _start(self):
+        self._done = threading.Event()
+        threading.Thread(target=self._run, name=self._name, daemon=True).start()
+
+    def _run(self):
+        try:
+            self._result = self._load()
+        except BaseException as e:
+            self._error = e
+            traceback.print_exc()
+        finally:
+            self._done.set()
+
+    def _after_fork(self):
+        if not self._done.is_set():
+            self._start()
+
+    @property
+    def state(self):
+        if not self._done.is_set():
+            return 'loading'
+        return 'failed' if self._error is not None else 'ready'
+
+    def get(self, timeout=None):
+        if not self._done.wait(timeout):
+            raise TimeoutError(f"{self._name} still running after {timeout}s")
+        if self._error is not None:
+            raise RuntimeError(f"{self._name} failed") from self._error
+        return self._result
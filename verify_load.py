@@ -1,6 +1,6 @@
 import sys
 import os
-sys.path.append('/home/parzival/analytics')
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 try:
     from data.engine import load_data